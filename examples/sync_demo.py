@@ -137,8 +137,8 @@ def main():
     except Exception as e:
         print(f"Error fetching value: {e}")
     finally:
-        # Stop the polling thread
-        client.stop_polling_thread()
+        # Release the client and stop its polling thread
+        client.close()
 
 
 if __name__ == "__main__":
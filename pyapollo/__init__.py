@@ -6,10 +6,12 @@ This package provides both synchronous and asynchronous clients for Apollo.
 
 from .client import ApolloClient
 from .async_client import AsyncApolloClient
+from .binding import ModelBinding
 from .settings import ApolloSettingsConfig
 
 __all__ = [
     "ApolloClient",
     "AsyncApolloClient",
     "ApolloSettingsConfig",
+    "ModelBinding",
 ]
@@ -25,35 +25,123 @@ import socket
 import base64
 import hashlib
 import asyncio
-from urllib.parse import urlparse
-from typing import Any, Dict, List, Optional, Union
+import inspect
+import weakref
+from urllib.parse import urlencode, urlparse
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
 
 import aiohttp
 import aiofiles
 from loguru import logger
 
-from pyapollo.exceptions import ServerNotResponseException
+from pyapollo.binding import ModelBinding, ModelT
+from pyapollo.budget import NamespaceBudget, estimate_size
+from pyapollo.codec import get_codec
+from pyapollo.compact import CompactNamespace
+from pyapollo.compression import compress, decompress, resolve_compression
+from pyapollo.exceptions import ServerNotResponseException, StaleConfigException
+from pyapollo.history import ReleaseHistory, ReleaseSnapshot
+from pyapollo.incremental import apply_changes, is_incremental
 from pyapollo.async_interface import AsyncConfigClientInterface
+from pyapollo.key_index import KeyIndex, KeyRangeView
+from pyapollo.meta import MetaServers, split_meta_server_addresses
+from pyapollo.schedule import PollSchedule
 from pyapollo.settings import ApolloSettingsConfig
+from pyapollo.singleflight import AsyncSingleFlight
+from pyapollo.stats import (
+    AccessReport,
+    AccessStats,
+    NamespaceAccounting,
+    NamespaceStats,
+)
+from pyapollo.snapshot import (
+    get_manifest_file_name,
+    get_snapshot_entries,
+    verify_snapshot_file,
+    write_manifest_entry,
+)
+from pyapollo.transport import (
+    AsyncTransport,
+    TransportResponse,
+    create_async_transport,
+)
+
+# Large namespaces are sent compressed when the server or the proxy in front of it supports it
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Apollo holds a notification request for 60 seconds while nothing is released
+NOTIFICATION_TIMEOUT = 90
+
+# Upper bound of the namespaces fetched concurrently
+FETCH_CONCURRENCY = 8
 
 
 class AsyncApolloClient(AsyncConfigClientInterface):
     """Asynchronous Apollo client based on the official HTTP API"""
 
-    _instances = {}
-    _instance_lock = None  # Will be initialized in __new__
+    _instances: Dict[Tuple, "AsyncApolloClient"] = {}
+    _live_clients = weakref.WeakSet()
 
     def __new__(cls, *args, **kwargs):
-        # Initialize class lock if not already initialized
-        if cls._instance_lock is None:
-            cls._instance_lock = asyncio.Lock()
-
-        # We can't use async/await in __new__, so we'll initialize the instance
-        # and set up the singleton pattern in __init__
-        instance = super().__new__(cls)
-        instance._initialized = False
+        # Return the registered client of the same app, __init__ skips it
+        key, env_settings = cls._resolve_instance_key(*args, **kwargs)
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._initialized = False
+            instance._instance_key = key
+            instance._env_settings = env_settings
         return instance
 
+    @classmethod
+    def _resolve_instance_key(
+        cls, *args, **kwargs
+    ) -> Tuple[Tuple, Optional[ApolloSettingsConfig]]:
+        """
+        Get the registry key of the client arguments: the meta server address,
+        app id, cluster, env and namespaces the client would be created with,
+        and the settings loaded from the environment when no settings, meta
+        server address or app id is given
+        """
+        env_settings = None
+        arguments = inspect.signature(cls.__init__).bind(None, *args, **kwargs)
+        arguments.apply_defaults()
+        settings = arguments.arguments["settings"]
+        meta_server_address = arguments.arguments["meta_server_address"]
+        app_id = arguments.arguments["app_id"]
+        if settings is None and meta_server_address is None and app_id is None:
+            settings = env_settings = ApolloSettingsConfig()
+        if settings is not None:
+            meta_server_address = settings.meta_server_address
+            app_id = settings.app_id
+            cluster = settings.cluster
+            env = settings.env
+            namespaces = settings.namespaces
+        else:
+            cluster = arguments.arguments["cluster"]
+            env = arguments.arguments["env"]
+            namespaces = arguments.arguments["namespaces"] or ["application"]
+        key = (
+            ",".join(split_meta_server_addresses(meta_server_address)),
+            app_id,
+            cluster,
+            env,
+            tuple(sorted(set(namespaces))),
+        )
+        return key, env_settings
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> "AsyncApolloClient":
+        """
+        Get the started client of the meta server, app id, cluster, env and
+        namespaces, it is created and started on first use and shared by the
+        later calls. Call close() when the client is no longer needed.
+
+        The arguments are the ones of the constructor, the ones other than the
+        registry key are ignored when the client already exists.
+        """
+        return await cls(*args, **kwargs).start()
+
     def __init__(
         self,
         meta_server_address: Optional[str] = None,
@@ -66,6 +154,23 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         timeout: int = 10,
         cycle_time: int = 30,
         cache_file_dir_path: Optional[str] = None,
+        fetch_strategy: str = "configs",
+        cache_file_compression: Optional[str] = None,
+        json_codec: str = "auto",
+        compact_storage: bool = False,
+        max_staleness: Optional[float] = None,
+        fork_polling: str = "all",
+        history_size: int = 5,
+        poll_jitter: float = 0.1,
+        poll_startup_spread: float = 0.0,
+        min_cycle_time: Optional[float] = None,
+        max_cycle_time: Optional[float] = None,
+        snapshot_dir_path: Optional[str] = None,
+        access_stats_sample_rate: float = 0.0,
+        lazy_namespaces: bool = False,
+        namespace_memory_budget: Optional[int] = None,
+        incremental_sync: bool = True,
+        transport: Union[str, AsyncTransport] = "default",
         session: Optional[aiohttp.ClientSession] = None,
         settings: Optional[ApolloSettingsConfig] = None,
     ):
@@ -73,7 +178,8 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         Initialize method
 
         Args:
-            meta_server_address: Apollo meta server address, format is like 'https://xxx/yyy'
+            meta_server_address: Apollo meta server address, format is like 'https://xxx/yyy',
+                several addresses separated by commas are queried in parallel
             app_id: Application ID
             app_secret: Application secret, optional
             cluster: Cluster name, default value is 'default'
@@ -83,7 +189,50 @@ class AsyncApolloClient(AsyncConfigClientInterface):
             ip: Deploy IP for grey release, default value is the local IP
             cycle_time: Cycle time to update configuration content from server
             cache_file_dir_path: Directory path to store the configuration cache file
-            session: aiohttp client session, if not provided, a new one will be created
+            fetch_strategy: 'configs' reads every namespace from the database backed
+                /configs API, 'configfiles' reads from the cached /configfiles/json API
+                and only uses /configs for namespaces with a release notification
+            cache_file_compression: Compress the cache files with 'zlib' or 'zstd',
+                default value is None which writes plain JSON
+            json_codec: JSON codec for responses, cache files and JSON values, 'auto'
+                selects orjson or msgspec when installed and falls back to 'json'
+            compact_storage: Store namespaces as sorted key and value tuples sharing
+                unchanged entries across releases, to save memory on large namespaces
+            max_staleness: Seconds after which a namespace not refreshed from apollo
+                server is reported as stale, default value is None for no bound
+            fork_polling: 'all' resumes polling in every forked child process on its
+                first read, 'manual' leaves it stopped until start_polling is called,
+                e.g. in the one designated child
+            history_size: Number of releases kept in memory per namespace for
+                pin_namespace, default value is 5, 0 disables the history
+            poll_jitter: Fraction of the polling interval added or removed at
+                random, so clients started together do not poll together
+            poll_startup_spread: Seconds over which the first poll after start is
+                spread at random, default value is 0
+            min_cycle_time: Polling interval of a namespace after it changed,
+                default value is None for cycle_time
+            max_cycle_time: Bound of the polling interval of a namespace while it
+                does not change, the interval doubles on every unchanged poll,
+                default value is None for cycle_time
+            snapshot_dir_path: Directory of a snapshot baked with `pyapollo bake`,
+                its namespaces are served at start without any request and
+                refreshed from apollo server in the background
+            access_stats_sample_rate: Fraction of the reads of get_value,
+                get_values and get_json_value counted for get_access_report,
+                default value is 0 which disables the counters
+            lazy_namespaces: Fetch every namespace on its first read instead of
+                at start, only the namespaces read are polled
+            namespace_memory_budget: Approximate bytes of the namespaces kept in
+                memory in lazy mode, the least recently read ones are evicted to
+                the local cache files, default value is None for no bound
+            incremental_sync: Send the release key of the snapshots with /configs
+                requests, so unchanged namespaces are answered with 304 and changed
+                ones with the changes only when apollo server supports it
+            transport: 'default' for aiohttp or 'httpx' for httpx with HTTP/2 when h2
+                is installed, an AsyncTransport instance can be passed instead to
+                share it between clients, it is then not closed by the client
+            session: aiohttp client session of the default transport, if not
+                provided, a new one will be created
             settings: ApolloSettingsConfig instance, if provided other parameters will be ignored
 
         You can initialize the client in three ways:
@@ -115,7 +264,7 @@ class AsyncApolloClient(AsyncConfigClientInterface):
 
         # Load configuration from settings or environment if no direct parameters provided
         if settings is None and meta_server_address is None and app_id is None:
-            settings = ApolloSettingsConfig()  # Will load from environment variables
+            settings = self._env_settings  # Loaded from environment variables
 
         # Initialize cache directory path first
         self._cache_file_dir_path = None
@@ -123,6 +272,7 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         # If settings is provided, use it
         if settings is not None:
             self._meta_server_address = settings.meta_server_address
+            self._meta_servers = MetaServers(settings.meta_server_address)
             self._app_id = settings.app_id
             self._app_secret = (
                 settings.app_secret if settings.using_app_secret else None
@@ -132,11 +282,32 @@ class AsyncApolloClient(AsyncConfigClientInterface):
             self._env = settings.env
             self._cycle_time = settings.cycle_time
             self._cache_file_dir_path = settings.cache_file_dir_path
+            self._fetch_strategy = settings.fetch_strategy
+            self._cache_file_compression = settings.cache_file_compression
+            self._codec = get_codec(settings.json_codec)
+            self._compact_storage = settings.compact_storage
+            self._max_staleness = settings.max_staleness
+            self._fork_polling = settings.fork_polling
+            self._history = ReleaseHistory(settings.history_size)
+            self._poll_schedule = PollSchedule(
+                settings.cycle_time,
+                min_cycle_time=settings.min_cycle_time,
+                max_cycle_time=settings.max_cycle_time,
+                jitter=settings.poll_jitter,
+                startup_spread=settings.poll_startup_spread,
+            )
+            transport = settings.transport
+            self._snapshot_dir_path = settings.snapshot_dir_path
+            self._access_stats = AccessStats(settings.access_stats_sample_rate)
+            self._lazy_namespaces = settings.lazy_namespaces
+            self._incremental_sync = settings.incremental_sync
+            self._namespace_budget = NamespaceBudget(settings.namespace_memory_budget)
             self.ip = self._get_local_ip_address(settings.ip)
             namespaces = settings.namespaces
         else:
             # Use direct parameters
             self._meta_server_address = meta_server_address
+            self._meta_servers = MetaServers(meta_server_address)
             self._app_id = app_id
             self._app_secret = app_secret
             self._cluster = cluster
@@ -144,6 +315,25 @@ class AsyncApolloClient(AsyncConfigClientInterface):
             self._env = env
             self._cycle_time = cycle_time
             self._cache_file_dir_path = cache_file_dir_path
+            self._fetch_strategy = fetch_strategy
+            self._cache_file_compression = cache_file_compression
+            self._codec = get_codec(json_codec)
+            self._compact_storage = compact_storage
+            self._max_staleness = max_staleness
+            self._fork_polling = fork_polling
+            self._history = ReleaseHistory(history_size)
+            self._poll_schedule = PollSchedule(
+                cycle_time,
+                min_cycle_time=min_cycle_time,
+                max_cycle_time=max_cycle_time,
+                jitter=poll_jitter,
+                startup_spread=poll_startup_spread,
+            )
+            self._snapshot_dir_path = snapshot_dir_path
+            self._access_stats = AccessStats(access_stats_sample_rate)
+            self._lazy_namespaces = lazy_namespaces
+            self._incremental_sync = incremental_sync
+            self._namespace_budget = NamespaceBudget(namespace_memory_budget)
             self.ip = self._get_local_ip_address(ip)
             if namespaces is None:
                 namespaces = ["application"]
@@ -154,10 +344,21 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         # Initialize other attributes
         self._cache: Dict = {}
         self._hash: Dict = {}
+        self._key_index: Dict[str, KeyIndex] = {}
+        self._model_bindings: Dict[Tuple, ModelBinding] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._pinned: Dict[str, ReleaseSnapshot] = {}
+        self._held_snapshots: Dict[str, Any] = {}
+        self._evicted_namespaces: Set[str] = set()
+        self._accounting = NamespaceAccounting()
+        self._refresh_snapshot = False
+        self._single_flight = AsyncSingleFlight()
         self._config_server_url = None
         self._config_server_host = None
         self._config_server_port = None
 
+        self._cache_file_compression = resolve_compression(self._cache_file_compression)
+
         # Initialize cache directory path if not set
         self._init_cache_file_dir_path(self._cache_file_dir_path)
 
@@ -166,34 +367,123 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         self._cache_file_write_lock = asyncio.Lock()
         self._stop_event = asyncio.Event()
         self._polling_task = None
-        self._session = session
-        self._owns_session = session is None  # Track if we created the session
+        self._owns_transport = not isinstance(transport, AsyncTransport)
+        self._transport = (
+            create_async_transport(transport, session)
+            if self._owns_transport
+            else transport
+        )
+        self._resume_polling_after_fork = False
+        self._start_lock = asyncio.Lock()
+        self._users = 0
         self._initialized = True
+        AsyncApolloClient._live_clients.add(self)
+
+        # Register the client, later constructions with the same key return it
+        AsyncApolloClient._instances[self._instance_key] = self
+
+    async def _load_snapshot(self) -> bool:
+        """
+        Load the namespaces from the baked snapshot directory, return whether
+        every namespace was loaded
+        """
+
+        manifest_path = os.path.join(
+            self._snapshot_dir_path, get_manifest_file_name(self._app_id)
+        )
+        try:
+            async with aiofiles.open(manifest_path, "rb") as f:
+                manifest = self._codec.loads(await f.read())
+            entries = get_snapshot_entries(
+                manifest, self._app_id, self._cluster, self._env
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Load snapshot {manifest_path} failed, error: {e}")
+            return False
+
+        # The snapshot is copied to the cache directory unless it is the cache
+        # directory, whose manifest would lose the seal
+        copy_to_cache = os.path.realpath(self._snapshot_dir_path) != os.path.realpath(
+            self._cache_file_dir_path
+        )
+        loaded = 0
+        for namespace in self._notification_map:
+            entry = entries.get(namespace)
+            if not entry:
+                continue
+            file_path = os.path.join(
+                self._snapshot_dir_path, os.path.basename(entry.get("file", ""))
+            )
+            try:
+                async with aiofiles.open(file_path, "rb") as f:
+                    content = await f.read()
+                verify_snapshot_file(entry, content)
+                data = self._decode_cache_file(content)
+            except (OSError, ValueError) as e:
+                logger.warning(
+                    f"Load snapshot of namespace({namespace}) failed, error: {e}"
+                )
+                continue
+            await self.update_cache(namespace, data)
+            release_key = entry.get("release_key")
+            if copy_to_cache:
+                try:
+                    await self.update_local_file_cache(
+                        release_key=release_key, data=data, namespace=namespace
+                    )
+                except OSError as e:
+                    logger.warning(
+                        f"Write cache file of namespace({namespace}) failed, error: {e}"
+                    )
+            self._hash[namespace] = release_key
+            loaded += 1
+        logger.info(f"Loaded {loaded} namespaces from snapshot {manifest_path}")
+        return loaded == len(self._notification_map)
 
-        # Store instance in class dictionary for singleton pattern
-        key = f"{self._meta_server_address},{self._app_id},{self._cluster},{self._env},{tuple(namespaces)}"
-        AsyncApolloClient._instances[key] = self
+    async def start(self) -> "AsyncApolloClient":
+        """
+        Load the configurations and start polling, only the first of the users
+        sharing the client starts it
+        """
+        async with self._start_lock:
+            if self._users == 0:
+                AsyncApolloClient._instances.setdefault(self._instance_key, self)
+                if self._snapshot_dir_path and await self._load_snapshot():
+                    # Serve the snapshot now, the polling task refreshes it
+                    self._refresh_snapshot = True
+                elif self._lazy_namespaces:
+                    # The namespaces are fetched on their first read
+                    await self.update_config_server()
+                else:
+                    await self.update_config_server()
+                    await self.fetch_configuration()
+                await self.start_polling()
+            self._users += 1
+        return self
 
-    async def _ensure_session(self):
-        """Ensure aiohttp session exists"""
-        if self._session is None:
-            self._session = aiohttp.ClientSession()
-            self._owns_session = True
+    async def close(self) -> None:
+        """
+        Release the client, the last of its users stops polling, closes the
+        transport and removes the client from the registry
+        """
+        async with self._start_lock:
+            if self._users > 0:
+                self._users -= 1
+                if self._users > 0:
+                    return
+            await self.stop_polling()
+            if self._owns_transport:
+                await self._transport.close()
+            if AsyncApolloClient._instances.get(self._instance_key) is self:
+                del AsyncApolloClient._instances[self._instance_key]
 
     async def __aenter__(self):
         """Async context manager entry"""
-        await self._ensure_session()
-        await self.update_config_server()
-        await self.fetch_configuration()
-        await self.start_polling()
-        return self
+        return await self.start()
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        await self.stop_polling()
-        if self._owns_session and self._session is not None:
-            await self._session.close()
-            self._session = None
+        await self.close()
 
     def _init_cache_file_dir_path(self, cache_file_dir_path=None):
         """
@@ -264,17 +554,66 @@ class AsyncApolloClient(AsyncConfigClientInterface):
                 return "127.0.0.1"
         return ip
 
+    async def _poll_namespaces(
+        self, namespaces: Iterable[str], changed_namespaces: Iterable[str]
+    ) -> None:
+        """
+        Fetch the due namespaces and adapt their polling intervals to whether
+        they changed
+        """
+
+        snapshots = {
+            namespace: self._get_latest_snapshot(namespace) for namespace in namespaces
+        }
+        await self.fetch_configuration(changed_namespaces, namespaces=list(snapshots))
+        for namespace, snapshot in snapshots.items():
+            self._poll_schedule.record(
+                namespace, self._get_latest_snapshot(namespace) is not snapshot
+            )
+
     async def _listener(self) -> None:
         """
         Asynchronous polling loop to get configuration from apollo server
         """
+        if self._refresh_snapshot:
+            # Refresh the snapshot soon, spread over the startup window
+            self._refresh_snapshot = False
+            try:
+                await asyncio.wait_for(
+                    self._stop_event.wait(),
+                    timeout=self._poll_schedule.get_startup_delay(),
+                )
+            except asyncio.TimeoutError:
+                pass
         while not self._stop_event.is_set():
             try:
-                await self.fetch_configuration()
+                if self._config_server_url is None:
+                    # Booted from a snapshot without reaching the meta server yet
+                    try:
+                        await self.update_config_server()
+                    except (Exception, ServerNotResponseException) as e:
+                        logger.warning(f"Update config server failed, error: {e}")
+                        await asyncio.sleep(self._cycle_time)
+                        continue
+                changed_namespaces = []
+                if self._fetch_strategy == "configfiles":
+                    changed_namespaces = await self._get_changed_namespaces()
+                namespaces = set(self._poll_schedule.due(self._get_polled_namespaces()))
+                namespaces.update(changed_namespaces)
+                if namespaces:
+                    await self._poll_namespaces(namespaces, changed_namespaces)
+                stale_namespaces = self.get_stale_namespaces()
+                if stale_namespaces:
+                    logger.warning(
+                        f"Apollo configuration is stale, age by namespace: {stale_namespaces}"
+                    )
                 # Use asyncio.wait_for with a timeout
                 try:
                     await asyncio.wait_for(
-                        self._stop_event.wait(), timeout=self._cycle_time
+                        self._stop_event.wait(),
+                        timeout=self._poll_schedule.next_wait(
+                            self._get_polled_namespaces()
+                        ),
                     )
                 except asyncio.TimeoutError:
                     # This is expected when the timeout is reached
@@ -284,6 +623,43 @@ class AsyncApolloClient(AsyncConfigClientInterface):
                 # Wait a bit before retrying to avoid tight loop on persistent errors
                 await asyncio.sleep(1)
 
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        """
+        Repair the clients inherited by a forked child process
+
+        The event loop, the polling tasks and the connections of the parent
+        process cannot be used in the child. The asyncio primitives are recreated
+        and the transport drops its connections, while the inherited cache is kept as a warm
+        start. Polling resumes on the first read in the child's event loop.
+        """
+        for client in list(cls._live_clients):
+            client._reset_after_fork()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Reset the client state bound to the parent process
+        """
+        was_polling = self._polling_task is not None
+        self._update_cache_lock = asyncio.Lock()
+        self._cache_file_write_lock = asyncio.Lock()
+        self._stop_event = asyncio.Event()
+        self._start_lock = asyncio.Lock()
+        self._single_flight = AsyncSingleFlight()
+        self._namespace_budget._reset_after_fork()
+        self._access_stats._reset_after_fork()
+        self._history._reset_after_fork()
+        self._polling_task = None
+        self._resume_polling_after_fork = was_polling and self._fork_polling == "all"
+
+    def _resume_polling_if_forked(self) -> None:
+        """
+        Resume polling in the running event loop of a forked child process
+        """
+        if self._resume_polling_after_fork:
+            self._resume_polling_after_fork = False
+            asyncio.get_running_loop().create_task(self.start_polling())
+
     async def start_polling(self) -> None:
         """
         Start the asynchronous polling task
@@ -292,6 +668,16 @@ class AsyncApolloClient(AsyncConfigClientInterface):
             return  # Already polling
 
         self._stop_event.clear()
+        # Namespaces served from a snapshot are refreshed right away
+        self._poll_schedule.start(
+            ()
+            if self._refresh_snapshot
+            else (
+                namespace
+                for namespace in self._notification_map
+                if namespace in self._cache
+            )
+        )
 
         # Get the appropriate event loop based on Python version
         try:
@@ -329,6 +715,64 @@ class AsyncApolloClient(AsyncConfigClientInterface):
 
         logger.success("Apollo async polling task stopped")
 
+    def _encode_cache_file(self, data: Any) -> bytes:
+        """
+        Encode the configurations to the content of a cache file
+        """
+
+        return compress(self._codec.dumps(data), self._cache_file_compression)
+
+    def _decode_cache_file(self, content: bytes) -> Any:
+        """
+        Decode the content of a cache file written with any compression setting
+
+        Raises:
+            ValueError: If the content is corrupted
+        """
+
+        return self._codec.loads(decompress(content))
+
+    def _get_cache_file_name(self, namespace: str) -> str:
+        """
+        Get the name of the cache file of the namespace
+        """
+        return f"{self._app_id}_configuration_{namespace}.txt"
+
+    def _get_manifest_path(self) -> str:
+        """
+        Get the path of the manifest indexing the cache files of the app
+        """
+        return os.path.join(self._cache_file_dir_path, f"{self._app_id}_manifest.json")
+
+    async def _read_manifest(self) -> Dict[str, Dict]:
+        """
+        Read the cache file entries by namespace from the manifest
+        """
+        try:
+            async with aiofiles.open(self._get_manifest_path(), "rb") as f:
+                return self._codec.loads(await f.read()).get("namespaces", {})
+        except (FileNotFoundError, ValueError, AttributeError):
+            return {}
+
+    async def _write_manifest_entry(
+        self, namespace: str, file_name: str, release_key: str
+    ) -> None:
+        """
+        Record the cache file and release key of the namespace in the manifest,
+        the manifest is replaced atomically so readers never see a partial one
+        """
+        # The lock of the manifest is shared with the clients of other threads,
+        # it is only held in the executor thread
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            write_manifest_entry,
+            self._get_manifest_path(),
+            self._app_id,
+            namespace,
+            {"file": file_name, "release_key": release_key, "updated_at": time.time()},
+            self._codec,
+        )
+
     async def update_local_file_cache(
         self, release_key: str, data: Any, namespace: str = "application"
     ) -> None:
@@ -337,160 +781,615 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         """
         if self._hash.get(namespace) != release_key:
             async with self._cache_file_write_lock:
-                _cache_file_path = os.path.join(
-                    self._cache_file_dir_path,
-                    f"{self._app_id}_configuration_{namespace}.txt",
-                )
+                file_name = self._get_cache_file_name(namespace)
+                _cache_file_path = os.path.join(self._cache_file_dir_path, file_name)
                 # Use async file operations if available, otherwise fall back to sync
                 try:
-                    async with aiofiles.open(
-                        _cache_file_path, "w", encoding="utf-8"
-                    ) as f:
-                        new_string = json.dumps(data)
-                        await f.write(new_string)
+                    async with aiofiles.open(_cache_file_path, "wb") as f:
+                        await f.write(self._encode_cache_file(data))
                 except ImportError:
                     # Fall back to synchronous file operations
-                    with open(_cache_file_path, "w", encoding="utf-8") as f:
-                        new_string = json.dumps(data)
-                        f.write(new_string)
+                    with open(_cache_file_path, "wb") as f:
+                        f.write(self._encode_cache_file(data))
 
                 self._hash[namespace] = release_key
+                await self._write_manifest_entry(namespace, file_name, release_key)
 
     async def get_local_file_cache(self, namespace: str = "application") -> Dict:
         """
         Get configuration from local cache file
         """
         cache_file_path = os.path.join(
-            self._cache_file_dir_path, f"{self._app_id}_configuration_{namespace}.txt"
+            self._cache_file_dir_path, self._get_cache_file_name(namespace)
         )
         try:
             # Use async file operations if available, otherwise fall back to sync
             try:
-                async with aiofiles.open(cache_file_path, "r", encoding="utf-8") as f:
+                async with aiofiles.open(cache_file_path, "rb") as f:
                     content = await f.read()
-                    return json.loads(content)
+                    return self._decode_cache_file(content)
             except ImportError:
                 # Fall back to synchronous file operations
-                with open(cache_file_path, "r", encoding="utf-8") as f:
-                    return json.loads(f.read())
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+                with open(cache_file_path, "rb") as f:
+                    return self._decode_cache_file(f.read())
+        except (FileNotFoundError, ValueError) as e:
             logger.error(f"Error reading cache file {cache_file_path}: {e}")
             return {}
 
-    async def _http_get(self, url: str, params: Dict = None) -> Dict:
+    async def _http_get(
+        self, url: str, params: Dict = None, timeout: Optional[float] = None
+    ) -> Dict:
         """
         Perform asynchronous HTTP GET request
         """
-        await self._ensure_session()
+        response = await self._send_get(url, params, timeout)
+        if response.status_code == 200:
+            return self._codec.loads(response.content)
+        logger.warning(
+            f"HTTP request failed with status {response.status_code}: {response.text}"
+        )
+        return {}
 
+    async def _send_get(
+        self, url: str, params: Dict = None, timeout: Optional[float] = None
+    ) -> TransportResponse:
+        """
+        Send an asynchronous HTTP GET request with the signature headers
+        """
         headers = (
             self._build_http_headers(url, self._app_id, self._app_secret)
             if self._app_secret
             else {}
         )
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
 
-        try:
-            async with self._session.get(
-                url=url, params=params, timeout=self._timeout, headers=headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    text = await response.text()
-                    logger.warning(
-                        f"HTTP request failed with status {response.status}: {text}"
-                    )
-                    return {}
-        except asyncio.TimeoutError:
-            raise ServerNotResponseException(f"Request to {url} timed out.")
-        except aiohttp.ClientConnectionError:
-            raise ServerNotResponseException(f"Failed to connect to {url}.")
+        return await self._transport.get(
+            url, params=params, headers=headers, timeout=timeout or self._timeout
+        )
 
     async def update_cache(self, namespace: str, data: Dict) -> None:
         """
         Update in-memory configuration cache
         """
         async with self._update_cache_lock:
-            self._cache[namespace] = data
+            # A pinned namespace keeps serving the pinned release, new releases
+            # are held aside until it is unpinned
+            pinned = namespace in self._pinned
+            previous = self._get_latest_snapshot(namespace)
+            if self._compact_storage:
+                data = CompactNamespace.build(
+                    data, previous if isinstance(previous, CompactNamespace) else None
+                )
+            # Keep the current snapshot while its content is unchanged, so the
+            # structures derived from it are only rebuilt on a new release
+            if previous != data:
+                if pinned:
+                    self._held_snapshots[namespace] = data
+                else:
+                    self._cache[namespace] = data
+            if self._lazy_namespaces:
+                self._fit_memory_budget(namespace)
+
+    def _fit_memory_budget(self, namespace: str) -> None:
+        """
+        Record the size of the namespace just updated and evict the least recently
+        read namespaces above the memory budget, with the cache lock held
+
+        Evicted namespaces are no longer polled, their local cache files are
+        read again on their next access.
+        """
+        evicted = self._namespace_budget.add(
+            namespace,
+            estimate_size(self._get_latest_snapshot(namespace)),
+            keep=self._pinned,
+        )
+        for evicted_namespace in evicted:
+            self._cache.pop(evicted_namespace, None)
+            self._key_index.pop(evicted_namespace, None)
+            self._poll_schedule.remove(evicted_namespace)
+            self._evicted_namespaces.add(evicted_namespace)
+        if evicted:
+            logger.info(
+                f"Evict namespaces {evicted} from memory, "
+                f"memory budget: {self._namespace_budget.memory_budget}"
+            )
+
+    def _get_polled_namespaces(self) -> List[str]:
+        """
+        Get the namespaces kept up to date, only the loaded ones in lazy mode
+        """
+        if self._lazy_namespaces:
+            return self._namespace_budget.namespaces
+        return list(self._notification_map)
+
+    async def load_namespace(self, namespace: str = "application") -> None:
+        """
+        Load the namespace in lazy mode, which otherwise happens on its first read
+
+        The namespace is fetched from apollo server the first time, and read
+        back from its local cache file after it was evicted from memory. Loaded
+        namespaces are marked as recently read. Every namespace is loaded at
+        start when the client is not lazy.
+        """
+        if not self._lazy_namespaces:
+            return
+        if namespace in self._cache:
+            self._namespace_budget.touch(namespace)
+            return
+        if namespace not in self._notification_map:
+            return
+        try:
+            if namespace in self._evicted_namespaces:
+                manifest = await self._read_manifest()
+                data, _ = await self._read_cache_entry(
+                    namespace, manifest.get(namespace)
+                )
+                if data is not None:
+                    self._evicted_namespaces.discard(namespace)
+                    await self.update_cache(namespace, data)
+                    return
+            await self.fetch_config_by_namespace(namespace)
+            self._poll_schedule.add(namespace)
+        except (Exception, ServerNotResponseException) as e:
+            logger.warning(f"Load namespace({namespace}) failed, error: {e}")
+
+    async def _get_read_snapshot(self, namespace: str) -> Optional[Any]:
+        """
+        Get the snapshot of the namespace for a read, loading it in lazy mode
+
+        The snapshot is taken once, a namespace evicted by a concurrent load
+        right after it was loaded is loaded again instead of read as missing.
+        """
+        if self._lazy_namespaces:
+            await self.load_namespace(namespace)
+        snapshot = self._cache.get(namespace)
+        if snapshot is None and self._lazy_namespaces:
+            await self.load_namespace(namespace)
+            snapshot = self._cache.get(namespace)
+        return snapshot
+
+    def _get_latest_snapshot(self, namespace: str) -> Optional[Any]:
+        """
+        Get the latest snapshot of the namespace, even if it is pinned
+        """
+
+        if namespace in self._held_snapshots:
+            return self._held_snapshots[namespace]
+        return self._cache.get(namespace)
+
+    def get_release_history(
+        self, namespace: str = "application"
+    ) -> List[ReleaseSnapshot]:
+        """
+        Get the recent releases of the namespace kept in memory, newest first
+        """
+
+        return self._history.get(namespace)
+
+    async def pin_namespace(
+        self, namespace: str = "application", release_key: Optional[str] = None
+    ) -> ReleaseSnapshot:
+        """
+        Serve a previous release of the namespace until it is unpinned
+
+        Args:
+            namespace: The namespace to pin
+            release_key: The release to pin, default value is None which pins the
+                release before the latest one
 
-    async def fetch_config_by_namespace(self, namespace: str = "application") -> None:
+        Raises:
+            ValueError: If the release is not in the history of the namespace
+        """
+
+        release = self._history.find(namespace, release_key)
+        if release is None:
+            raise ValueError(
+                f"Release {release_key} of namespace({namespace}) is not in the history"
+            )
+        async with self._update_cache_lock:
+            if namespace not in self._pinned and namespace in self._cache:
+                self._held_snapshots[namespace] = self._cache[namespace]
+            self._pinned[namespace] = release
+            self._cache[namespace] = release.configurations
+        logger.warning(f"Pin namespace({namespace}) to release {release.release_key}")
+        return release
+
+    async def unpin_namespace(self, namespace: str = "application") -> None:
+        """
+        Serve the latest release of the pinned namespace again
+        """
+
+        async with self._update_cache_lock:
+            if self._pinned.pop(namespace, None) is None:
+                return
+            if namespace in self._held_snapshots:
+                self._cache[namespace] = self._held_snapshots.pop(namespace)
+        logger.warning(f"Unpin namespace({namespace})")
+
+    def get_access_report(self, top: int = 20) -> AccessReport:
+        """
+        Get the sampled statistics of the configuration reads: the most read keys,
+        the keys never read and the estimated reads per second of every namespace
+        """
+
+        return self._access_stats.report(
+            {
+                namespace: self._cache.get(namespace)
+                for namespace in self._notification_map
+            },
+            top,
+        )
+
+    def reset_access_stats(self) -> None:
+        """
+        Forget the sampled reads and restart the report period
+        """
+
+        self._access_stats.reset()
+
+    def get_namespace_stats(self) -> Dict[str, NamespaceStats]:
+        """
+        Get the key count, approximate memory size, last payload size and decode
+        time and release key of every namespace
+        """
+
+        return {
+            namespace: self._accounting.get_stats(
+                namespace,
+                self._get_latest_snapshot(namespace),
+                self._hash.get(namespace),
+            )
+            for namespace in self._notification_map
+        }
+
+    async def _keep_or_load_local_cache(self, namespace: str) -> None:
+        """
+        Keep serving the in-memory snapshot of the namespace after a failed fetch
+
+        The snapshot stays in place until a later fetch revalidates it, which
+        never regresses to an older release. The local cache file is only read
+        when the namespace has no snapshot yet.
+        """
+
+        if namespace in self._cache:
+            logger.warning(
+                f"Keep serving namespace({namespace}) from memory, "
+                f"last refreshed {self.get_config_age(namespace)} seconds ago"
+            )
+            return
+        data = await self.get_local_file_cache(namespace)
+        await self.update_cache(namespace, data)
+
+    def get_config_age(self, namespace: str = "application") -> Optional[float]:
+        """
+        Get the seconds since the namespace was last refreshed from apollo server,
+        None if it has never been refreshed
+        """
+
+        refreshed_at = self._refreshed_at.get(namespace)
+        if refreshed_at is None:
+            return None
+        return time.monotonic() - refreshed_at
+
+    def get_stale_namespaces(
+        self, max_staleness: Optional[float] = None
+    ) -> Dict[str, Optional[float]]:
+        """
+        Get the age of the namespaces not refreshed within max_staleness seconds
+
+        max_staleness defaults to the max_staleness of the client, every namespace
+        is fresh when neither is set. A namespace never refreshed has age None.
+        """
+
+        if max_staleness is None:
+            max_staleness = self._max_staleness
+        if max_staleness is None:
+            return {}
+        stale_namespaces = {}
+        for namespace in self._get_polled_namespaces():
+            age = self.get_config_age(namespace)
+            if age is None or age > max_staleness:
+                stale_namespaces[namespace] = age
+        return stale_namespaces
+
+    def ensure_fresh(self, max_staleness: Optional[float] = None) -> None:
+        """
+        Check every namespace was refreshed within max_staleness seconds
+
+        Raises:
+            StaleConfigException: If a namespace is staler than the bound
+        """
+
+        stale_namespaces = self.get_stale_namespaces(max_staleness)
+        if stale_namespaces:
+            raise StaleConfigException(
+                f"Apollo configuration is stale, age by namespace: {stale_namespaces}"
+            )
+
+    def _build_config_url(self, namespace: str, use_cache_endpoint: bool) -> str:
+        """
+        Build the url to read the configuration of the namespace
+        """
+        endpoint = "configfiles/json" if use_cache_endpoint else "configs"
+        return f"{self._config_server_host}:{self._config_server_port}/{endpoint}/{self._app_id}/{self._cluster}/{namespace}"
+
+    async def fetch_config_by_namespace(
+        self, namespace: str = "application", use_cache_endpoint: Optional[bool] = None
+    ) -> None:
         """
         Fetch configuration of the namespace from apollo server
+
+        The cached /configfiles/json endpoint is used when the fetch strategy is
+        'configfiles', unless use_cache_endpoint says otherwise. Concurrent
+        fetches of the namespace from the same endpoint share one request.
+        """
+        if use_cache_endpoint is None:
+            use_cache_endpoint = self._fetch_strategy == "configfiles"
+        return await self._single_flight.do(
+            (namespace, use_cache_endpoint),
+            self._fetch_config_by_namespace,
+            namespace,
+            use_cache_endpoint,
+        )
+
+    async def _fetch_config_by_namespace(
+        self, namespace: str, use_cache_endpoint: bool, incremental: bool = True
+    ) -> None:
         """
-        url = f"{self._config_server_host}:{self._config_server_port}/configs/{self._app_id}/{self._cluster}/{namespace}"
+        Fetch configuration of the namespace from the endpoint
+
+        Requests to /configs carry the release key of the current snapshot
+        unless incremental is False, for the full configurations.
+        """
+        url = self._build_config_url(namespace, use_cache_endpoint)
+        base_release_key = None
+        if incremental and not use_cache_endpoint:
+            base_release_key = self._get_base_release_key(namespace)
+            if base_release_key:
+                url = f"{url}?{urlencode({'releaseKey': base_release_key})}"
         try:
-            data = await self._http_get(url)
-            if data:
-                configurations = data.get("configurations", {})
-                release_key = data.get("releaseKey", str(time.time()))
+            response = await self._send_get(url)
+            if response.status_code == 304 and base_release_key:
+                # The release of the snapshot is still the latest one
+                self._refreshed_at[namespace] = time.monotonic()
+                return
+            if response.status_code == 200:
+                decode_started = time.perf_counter()
+                data = self._codec.loads(response.content)
+                self._accounting.record_payload(
+                    namespace,
+                    len(response.content),
+                    time.perf_counter() - decode_started,
+                )
+                if use_cache_endpoint:
+                    # The cached endpoint returns the bare configurations without
+                    # a release key, keep the known one while the content is unchanged
+                    configurations = data
+                    if configurations == self._get_latest_snapshot(namespace):
+                        release_key = self._hash.get(namespace)
+                    else:
+                        release_key = str(time.time())
+                elif base_release_key:
+                    configurations = self._apply_sync_response(namespace, data)
+                    if configurations is None:
+                        return await self._fetch_config_by_namespace(
+                            namespace, use_cache_endpoint, incremental=False
+                        )
+                    release_key = data.get("releaseKey", str(time.time()))
+                else:
+                    configurations = data.get("configurations", {})
+                    release_key = data.get("releaseKey", str(time.time()))
                 await self.update_cache(namespace, configurations)
+                self._history.record(
+                    namespace, release_key, self._get_latest_snapshot(namespace)
+                )
 
                 await self.update_local_file_cache(
                     release_key=release_key,
                     data=configurations,
                     namespace=namespace,
                 )
+                self._refreshed_at[namespace] = time.monotonic()
             else:
                 logger.warning(
-                    "Get configuration from apollo failed, load from local cache file"
+                    f"HTTP request failed with status {response.status_code}: {response.text}"
                 )
-                data = await self.get_local_file_cache(namespace)
-                await self.update_cache(namespace, data)
+                logger.warning(
+                    f"Get configuration of namespace({namespace}) from apollo failed"
+                )
+                await self._keep_or_load_local_cache(namespace)
 
-        except Exception as e:
-            data = await self.get_local_file_cache(namespace)
-            await self.update_cache(namespace, data)
+        except (Exception, ServerNotResponseException) as e:
+            await self._keep_or_load_local_cache(namespace)
 
             logger.error(
                 f"Fetch apollo configuration meet error, error: {e}, url: {url}, "
                 f"config server url: {self._config_server_url}, host: {self._config_server_host}, "
                 f"port: {self._config_server_port}"
             )
-            await self.update_config_server(exclude=self._config_server_host)
+            try:
+                await self.update_config_server(exclude=self._config_server_host)
+            except (Exception, ServerNotResponseException) as e:
+                logger.warning(f"Update config server failed, error: {e}")
 
-    async def fetch_configuration(self) -> None:
+    def _get_base_release_key(self, namespace: str) -> Optional[str]:
         """
-        Get configurations for all namespaces from apollo server
+        Get the release key sent with /configs requests, the one of the current
+        snapshot of the namespace
+        """
+        if not self._incremental_sync or self._get_latest_snapshot(namespace) is None:
+            return None
+        return self._hash.get(namespace)
+
+    def _apply_sync_response(self, namespace: str, data: Dict) -> Optional[Dict]:
+        """
+        Get the configurations of a /configs response to a request with the
+        release key, applying the changes of an incremental sync to the current
+        snapshot, None when they cannot be applied
         """
         try:
-            for namespace in self._notification_map.keys():
-                await self.fetch_config_by_namespace(namespace)
-        except aiohttp.ClientError as e:
-            logger.warning(f"HTTP client error: {str(e)}")
-            await self.load_local_cache_file()
-        except asyncio.TimeoutError as e:
-            logger.warning(f"Request timeout: {str(e)}")
+            if not is_incremental(data):
+                return data.get("configurations", {})
+            snapshot = self._get_latest_snapshot(namespace)
+            if snapshot is None:
+                raise ValueError("no snapshot to apply the changes to")
+            return apply_changes(snapshot, data.get("configurationChanges") or [])
+        except ValueError as e:
+            logger.warning(
+                f"Apply incremental sync of namespace({namespace}) failed, "
+                f"error: {e}, fall back to full sync"
+            )
+            return None
+
+    async def fetch_configuration(
+        self,
+        changed_namespaces: Optional[Iterable[str]] = None,
+        namespaces: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Get configurations for the namespaces from apollo server, default value
+        of namespaces is None for all namespaces
+
+        Namespaces in changed_namespaces are known to have a new release and are
+        always read from /configs, bypassing the cached endpoint. Up to
+        FETCH_CONCURRENCY namespaces are fetched concurrently, as streams of one
+        connection with the HTTP/2 transport.
+        """
+        changed_namespaces = set(changed_namespaces or ())
+        namespaces = None if namespaces is None else set(namespaces)
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def fetch(namespace: str) -> None:
+            async with semaphore:
+                if namespace in changed_namespaces:
+                    await self.fetch_config_by_namespace(
+                        namespace, use_cache_endpoint=False
+                    )
+                else:
+                    await self.fetch_config_by_namespace(namespace)
+
+        results = await asyncio.gather(
+            *(
+                fetch(namespace)
+                for namespace in self._get_polled_namespaces()
+                if namespaces is None or namespace in namespaces
+            ),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for error in errors:
+            if not isinstance(error, ServerNotResponseException):
+                raise error
+        if errors:
+            logger.warning(str(errors[0]))
             await self.load_local_cache_file()
 
-    async def load_local_cache_file(self) -> bool:
+    async def _get_changed_namespaces(self) -> List[str]:
         """
-        Load local cache file to memory
+        Get the namespaces with a new release from the notification API
+
+        Apollo holds the notification request for up to 60 seconds until a
+        release happens. The request waits longer than that, so an idle poll
+        ends with the 304 of the server instead of a client timeout and a
+        release during the hold is seen at once.
+        The first notification of a namespace only records its id because the
+        namespace was just loaded.
         """
+        notifications = [
+            {
+                "namespaceName": namespace,
+                "notificationId": self._notification_map[namespace],
+            }
+            for namespace in self._get_polled_namespaces()
+        ]
+        query = urlencode(
+            {
+                "appId": self._app_id,
+                "cluster": self._cluster,
+                "notifications": json.dumps(notifications, ensure_ascii=False),
+            }
+        )
+        url = f"{self._config_server_host}:{self._config_server_port}/notifications/v2?{query}"
         try:
-            for file_name in os.listdir(self._cache_file_dir_path):
-                file_path = os.path.join(self._cache_file_dir_path, file_name)
-                if os.path.isfile(file_path):
-                    file_simple_name, file_ext_name = os.path.splitext(file_name)
-                    if file_ext_name == ".swp":
-                        continue
-                    if not file_simple_name.startswith(
-                        f"{self._app_id}_configuration_"
-                    ):
-                        continue
+            data = await self._http_get(
+                url, timeout=max(NOTIFICATION_TIMEOUT, self._timeout)
+            )
+            changed_namespaces = []
+            for notification in data or []:
+                namespace = notification.get("namespaceName")
+                if namespace not in self._notification_map:
+                    continue
+                previous_id = self._notification_map[namespace]
+                self._notification_map[namespace] = notification.get(
+                    "notificationId", previous_id
+                )
+                if previous_id != -1:
+                    changed_namespaces.append(namespace)
+            return changed_namespaces
+        except ServerNotResponseException:
+            return []
+        except Exception as e:
+            logger.warning(f"Get apollo notifications failed, error: {e}")
+            return []
 
-                    namespace = file_simple_name.split("_")[-1]
+    async def _read_cache_entry(
+        self, namespace: str, entry: Optional[Dict]
+    ) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Read the cache file of the namespace listed in the manifest entry,
+        return the configurations and release key, or None when there is no
+        readable file
+        """
+        file_name = self._get_cache_file_name(namespace)
+        release_key = None
+        if entry:
+            # Only trust the base name, the manifest may come from another host
+            file_name = os.path.basename(entry.get("file") or file_name)
+            release_key = entry.get("release_key")
+        try:
+            async with aiofiles.open(
+                os.path.join(self._cache_file_dir_path, file_name), "rb"
+            ) as f:
+                return self._decode_cache_file(await f.read()), release_key
+        except FileNotFoundError:
+            return None, None
+        except ValueError as e:
+            logger.warning(
+                f"Skip corrupted cache file {file_name} of namespace({namespace}), "
+                f"error: {e}"
+            )
+            return None, None
 
-                    # Use async file operations if available, otherwise fall back to sync
-                    try:
-                        async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                            content = await f.read()
-                            data = json.loads(content)
-                    except ImportError:
-                        # Fall back to synchronous file operations
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            data = json.loads(f.read())
+    async def load_local_cache_file(self) -> bool:
+        """
+        Load local cache file to memory
 
-                    await self.update_cache(namespace, data)
+        Only the configured namespaces without an in-memory snapshot are loaded,
+        concurrently, using the manifest of the app instead of scanning the cache
+        directory. A snapshot in memory is never replaced by an older release
+        from disk.
+        """
+        namespaces = [
+            namespace
+            for namespace in self._get_polled_namespaces()
+            if namespace not in self._cache
+        ]
+        if not namespaces:
+            return True
+        try:
+            manifest = await self._read_manifest()
+            entries = await asyncio.gather(
+                *(
+                    self._read_cache_entry(namespace, manifest.get(namespace))
+                    for namespace in namespaces
+                )
+            )
+            for namespace, (data, release_key) in zip(namespaces, entries):
+                if data is None:
+                    continue
+                await self.update_cache(namespace, data)
+                if release_key is not None:
+                    self._hash[namespace] = release_key
             return True
         except Exception as e:
             logger.error(f"Error loading local cache files: {e}")
@@ -499,23 +1398,31 @@ class AsyncApolloClient(AsyncConfigClientInterface):
     async def get_service_conf(self) -> List:
         """
         Get the config servers
+
+        With several meta servers the first valid answer of a concurrent query
+        is used, then the fastest meta server is queried until it fails.
+        """
+        return await self._meta_servers.query_async(self._get_service_conf_from)
+
+    async def _get_service_conf_from(self, meta_server_address: str) -> List:
+        """
+        Get the config servers from the meta server
         """
-        await self._ensure_session()
-        service_conf_url = f"{self._meta_server_address}/services/config"
+        service_conf_url = f"{meta_server_address}/services/config"
 
         try:
-            async with self._session.get(service_conf_url) as response:
-                if response.status == 200:
-                    service_conf = await response.json()
-                    if not service_conf:
-                        raise ValueError("No apollo service found")
-                    return service_conf
-                else:
-                    text = await response.text()
-                    raise ValueError(
-                        f"Failed to get service config: {response.status} - {text}"
-                    )
-        except Exception as e:
+            response = await self._transport.get(
+                service_conf_url, timeout=self._timeout
+            )
+            if response.status_code != 200:
+                raise ServerNotResponseException(
+                    f"Failed to get service config: {response.status_code} - {response.text}"
+                )
+            service_conf = self._codec.loads(response.content)
+            if not service_conf:
+                raise ValueError("No apollo service found")
+            return service_conf
+        except (Exception, ServerNotResponseException) as e:
             logger.error(f"Error getting service configuration: {e}")
             raise
 
@@ -558,14 +1465,147 @@ class AsyncApolloClient(AsyncConfigClientInterface):
         """
         Get the configuration value
         """
-        try:
-            if namespace in self._cache:
-                return self._cache[namespace].get(key, default_val)
+        if self._resume_polling_after_fork:
+            self._resume_polling_if_forked()
+        snapshot = await self._get_read_snapshot(namespace)
+        self._access_stats.record(namespace, key)
+        if snapshot is None:
             return default_val
+        try:
+            return snapshot.get(key, default_val)
         except Exception as e:
             logger.error(f"Get key({key}) value failed, error: {e}")
             return default_val
 
+    async def get_values(
+        self,
+        keys: Iterable[str],
+        namespace: str = "application",
+        defaults: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get the values of several keys from one snapshot of the namespace
+
+        A key missing from the namespace gets its value from defaults, or None.
+        """
+        if self._resume_polling_after_fork:
+            self._resume_polling_if_forked()
+        snapshot = await self._get_read_snapshot(namespace) or {}
+        keys = list(keys)
+        self._access_stats.record_many(namespace, keys)
+        defaults = defaults or {}
+        return {key: snapshot.get(key, defaults.get(key)) for key in keys}
+
+    async def get_values_by_namespace(
+        self,
+        keys_by_namespace: Dict[str, Iterable[str]],
+        defaults: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the values of several keys in several namespaces from one consistent view
+
+        The snapshots are read without yielding to the event loop, so the result
+        never mixes releases that were applied while it was being read.
+        """
+        if self._resume_polling_after_fork:
+            self._resume_polling_if_forked()
+        if self._lazy_namespaces:
+            for namespace in keys_by_namespace:
+                await self.load_namespace(namespace)
+        snapshots = {
+            namespace: self._cache.get(namespace) or {}
+            for namespace in keys_by_namespace
+        }
+        defaults = defaults or {}
+        result = {}
+        for namespace, keys in keys_by_namespace.items():
+            keys = list(keys)
+            self._access_stats.record_many(namespace, keys)
+            snapshot = snapshots[namespace]
+            namespace_defaults = defaults.get(namespace) or {}
+            result[namespace] = {
+                key: snapshot.get(key, namespace_defaults.get(key)) for key in keys
+            }
+        return result
+
+    async def bind_model(
+        self,
+        model_cls: Type[ModelT],
+        namespace: str = "application",
+        prefix: Optional[str] = None,
+    ) -> ModelBinding[ModelT]:
+        """
+        Bind the namespace, or the keys under the prefix, to a pydantic model
+
+        The model is validated once per release and read via `binding.model`,
+        a release that fails validation keeps the last valid model. In lazy
+        mode the namespace is loaded first, and the binding keeps its last
+        model while the namespace is evicted.
+        """
+        if self._resume_polling_after_fork:
+            self._resume_polling_if_forked()
+        if self._lazy_namespaces:
+            await self.load_namespace(namespace)
+
+        key = (model_cls, namespace, prefix)
+        binding = self._model_bindings.get(key)
+        if binding is None:
+            binding = ModelBinding(
+                model_cls,
+                namespace,
+                lambda name: self._cache.get(name),
+                self._get_key_index,
+                prefix,
+            )
+            self._model_bindings[key] = binding
+        return binding
+
+    def _get_key_index(self, namespace: str) -> Optional[KeyIndex]:
+        """
+        Get the sorted key index of the namespace snapshot, rebuilt when the snapshot changes
+        """
+        snapshot = self._cache.get(namespace)
+        if snapshot is None:
+            return None
+        index = self._key_index.get(namespace)
+        if index is None or index.snapshot is not snapshot:
+            index = KeyIndex(snapshot)
+            self._key_index[namespace] = index
+        return index
+
+    async def get_by_prefix(
+        self, prefix: str, namespace: str = "application"
+    ) -> KeyRangeView:
+        """
+        Get a read-only view of the configurations whose key starts with the prefix
+        """
+        if self._resume_polling_after_fork:
+            self._resume_polling_if_forked()
+        if self._lazy_namespaces:
+            await self.load_namespace(namespace)
+        index = self._get_key_index(namespace)
+        if index is None:
+            return KeyRangeView({}, [], 0, 0)
+        return index.prefix(prefix)
+
+    async def get_by_range(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        namespace: str = "application",
+    ) -> KeyRangeView:
+        """
+        Get a read-only view of the configurations whose key k is in start <= k < end
+        """
+        if self._resume_polling_after_fork:
+            self._resume_polling_if_forked()
+        if self._lazy_namespaces:
+            await self.load_namespace(namespace)
+        index = self._get_key_index(namespace)
+        if index is None:
+            return KeyRangeView({}, [], 0, 0)
+        return index.range(start, end)
+
     async def get_json_value(
         self,
         key: str,
@@ -580,7 +1620,11 @@ class AsyncApolloClient(AsyncConfigClientInterface):
             return default_val or {}
 
         try:
-            return json.loads(val)
-        except (json.JSONDecodeError, TypeError):
+            return self._codec.loads(val)
+        except (ValueError, TypeError):
             logger.error(f"The value of key({key}) is not json format")
             return default_val or {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=AsyncApolloClient._after_fork_in_child)
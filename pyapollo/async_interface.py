@@ -3,7 +3,9 @@ Abstract interface for asynchronous configuration client implementations.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type
+
+from pydantic import BaseModel
 
 
 class AsyncConfigClientInterface(ABC):
@@ -40,6 +42,244 @@ class AsyncConfigClientInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_values(
+        self,
+        keys: Iterable[str],
+        namespace: str = "application",
+        defaults: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get configuration values for several keys from one namespace snapshot.
+
+        Args:
+            keys: The configuration keys to get values for
+            namespace: The namespace to get configuration from
+            defaults: Default values by key for keys that don't exist
+
+        Returns:
+            The values by key
+        """
+        pass
+
+    @abstractmethod
+    async def get_values_by_namespace(
+        self,
+        keys_by_namespace: Dict[str, Iterable[str]],
+        defaults: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get configuration values for keys in several namespaces from one consistent view.
+
+        Args:
+            keys_by_namespace: The configuration keys to get values for by namespace
+            defaults: Default values by namespace and key for keys that don't exist
+
+        Returns:
+            The values by namespace and key
+        """
+        pass
+
+    @abstractmethod
+    async def get_by_prefix(
+        self, prefix: str, namespace: str = "application"
+    ) -> Mapping:
+        """
+        Get the configurations whose key starts with the prefix.
+
+        Args:
+            prefix: The key prefix to look up
+            namespace: The namespace to get configuration from
+
+        Returns:
+            A read-only mapping view of the matching configurations
+        """
+        pass
+
+    @abstractmethod
+    async def get_by_range(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        namespace: str = "application",
+    ) -> Mapping:
+        """
+        Get the configurations whose key k is in start <= k < end.
+
+        Args:
+            start: The inclusive lower bound, None for no lower bound
+            end: The exclusive upper bound, None for no upper bound
+            namespace: The namespace to get configuration from
+
+        Returns:
+            A read-only mapping view of the matching configurations in key order
+        """
+        pass
+
+    @abstractmethod
+    async def bind_model(
+        self,
+        model_cls: Type[BaseModel],
+        namespace: str = "application",
+        prefix: Optional[str] = None,
+    ) -> Any:
+        """
+        Bind a namespace, or the keys under a prefix, to a pydantic model.
+
+        Args:
+            model_cls: The pydantic model class to validate the configurations into
+            namespace: The namespace to get configuration from
+            prefix: Only bind the keys starting with the prefix, the prefix is
+                removed from the field names
+
+        Returns:
+            The binding whose `model` attribute holds the validated model
+        """
+        pass
+
+    @abstractmethod
+    def get_config_age(self, namespace: str = "application") -> Optional[float]:
+        """
+        Get the seconds since a namespace was last refreshed from the server.
+
+        Args:
+            namespace: The namespace to get the age of
+
+        Returns:
+            The age in seconds, None if the namespace has never been refreshed
+        """
+        pass
+
+    @abstractmethod
+    def get_stale_namespaces(
+        self, max_staleness: Optional[float] = None
+    ) -> Dict[str, Optional[float]]:
+        """
+        Get the namespaces not refreshed within the staleness bound.
+
+        Args:
+            max_staleness: The staleness bound in seconds, defaults to the client's
+
+        Returns:
+            The age of the stale namespaces by namespace
+        """
+        pass
+
+    @abstractmethod
+    def ensure_fresh(self, max_staleness: Optional[float] = None) -> None:
+        """
+        Check every namespace was refreshed within the staleness bound.
+
+        Args:
+            max_staleness: The staleness bound in seconds, defaults to the client's
+
+        Raises:
+            StaleConfigException: If a namespace is staler than the bound
+        """
+        pass
+
+    @abstractmethod
+    def get_release_history(self, namespace: str = "application") -> List[Any]:
+        """
+        Get the recent releases of a namespace kept in memory.
+
+        Args:
+            namespace: The namespace to get the releases of
+
+        Returns:
+            The release snapshots, newest first
+        """
+        pass
+
+    @abstractmethod
+    async def pin_namespace(
+        self, namespace: str = "application", release_key: Optional[str] = None
+    ) -> Any:
+        """
+        Serve a previous release of a namespace until it is unpinned.
+
+        Args:
+            namespace: The namespace to pin
+            release_key: The release to pin, None pins the previous release
+
+        Returns:
+            The pinned release snapshot
+
+        Raises:
+            ValueError: If the release is not in the history of the namespace
+        """
+        pass
+
+    @abstractmethod
+    async def unpin_namespace(self, namespace: str = "application") -> None:
+        """
+        Serve the latest release of a pinned namespace again.
+
+        Args:
+            namespace: The namespace to unpin
+        """
+        pass
+
+    @abstractmethod
+    async def load_namespace(self, namespace: str = "application") -> None:
+        """
+        Load a namespace in lazy mode before its first read.
+
+        Args:
+            namespace: The namespace to load
+        """
+        pass
+
+    @abstractmethod
+    def get_access_report(self, top: int = 20) -> Any:
+        """
+        Get the sampled statistics of the configuration reads.
+
+        Args:
+            top: Number of the most read keys reported
+
+        Returns:
+            The report with the most read keys, the keys never read and the
+            estimated reads per second of every namespace
+        """
+        pass
+
+    @abstractmethod
+    def reset_access_stats(self) -> None:
+        """
+        Forget the sampled reads and restart the report period.
+        """
+        pass
+
+    @abstractmethod
+    def get_namespace_stats(self) -> Dict[str, Any]:
+        """
+        Get what every namespace costs.
+
+        Returns:
+            The key count, approximate memory size, last payload size and decode
+            time and release key by namespace
+        """
+        pass
+
+    @abstractmethod
+    async def start(self) -> "AsyncConfigClientInterface":
+        """
+        Load the configurations and start polling, once for all the users of the
+        client.
+
+        Returns:
+            The started client
+        """
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Release the client, the last of its users stops it.
+        """
+        pass
+
     @abstractmethod
     async def get_service_conf(self) -> List:
         """
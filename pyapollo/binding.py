@@ -0,0 +1,97 @@
+"""
+Bind namespaces to validated pydantic models.
+
+A binding validates the configurations of a namespace, or of the keys under a
+prefix, into a user pydantic model once per namespace snapshot. Snapshots are
+only replaced when a new release arrives, so reading the bound model on a hot
+path is an identity check and an attribute access.
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Generic, Optional, Type, TypeVar
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from pyapollo.key_index import KeyIndex
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ModelBinding(Generic[ModelT]):
+    """Pydantic model bound to a namespace of an Apollo client"""
+
+    def __init__(
+        self,
+        model_cls: Type[ModelT],
+        namespace: str,
+        get_snapshot: Callable[[str], Optional[Mapping]],
+        get_key_index: Callable[[str], Optional[KeyIndex]],
+        prefix: Optional[str] = None,
+    ):
+        """
+        Initialize method
+
+        Args:
+            model_cls: The pydantic model class to validate the configurations into
+            namespace: The namespace to read the configurations from
+            get_snapshot: Callable returning the current snapshot of a namespace
+            get_key_index: Callable returning the key index of a namespace snapshot
+            prefix: Only bind the keys starting with the prefix, the prefix is
+                removed from the field names
+        """
+        self.model_cls = model_cls
+        self.namespace = namespace
+        self.prefix = prefix
+        self.error: Optional[ValidationError] = None
+        self._get_snapshot = get_snapshot
+        self._get_key_index = get_key_index
+        self._snapshot: Optional[Mapping] = None
+        self._model: Optional[ModelT] = None
+
+    @property
+    def model(self) -> ModelT:
+        """
+        Get the model of the current snapshot
+
+        When the current snapshot fails validation the last valid model is kept
+        and the error is stored in `error`.
+
+        Raises:
+            ValidationError: If no snapshot has ever been valid
+            LookupError: If the namespace has not been loaded yet
+        """
+        snapshot = self._get_snapshot(self.namespace)
+        if snapshot is not None and snapshot is not self._snapshot:
+            self._rebuild(snapshot)
+        if self._model is None:
+            if self.error is not None:
+                raise self.error
+            raise LookupError(f"Namespace {self.namespace} is not loaded")
+        return self._model
+
+    def _rebuild(self, snapshot: Mapping) -> None:
+        """
+        Validate the snapshot into a new model
+        """
+        self._snapshot = snapshot
+        data = snapshot
+        if self.prefix:
+            index = self._get_key_index(self.namespace)
+            if index is None or index.snapshot is not snapshot:
+                index = KeyIndex(snapshot)
+            offset = len(self.prefix)
+            data = {
+                key[offset:]: value for key, value in index.prefix(self.prefix).items()
+            }
+        try:
+            self._model = self.model_cls.model_validate(
+                data if isinstance(data, dict) else dict(data)
+            )
+            self.error = None
+        except ValidationError as e:
+            self.error = e
+            logger.error(
+                f"Validate namespace({self.namespace}) into {self.model_cls.__name__} "
+                f"failed, keep the last valid model, error: {e}"
+            )
@@ -0,0 +1,106 @@
+"""
+Memory budget of the namespaces loaded lazily.
+
+In lazy mode a client only keeps the namespaces that are read in memory. The
+budget tracks the approximate size of every loaded namespace in least recently
+used order, and picks the namespaces to evict when a load brings the total
+above the budget. Evicted namespaces stay in the local cache files and are read
+back from them on their next access.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Collection, List, Mapping, Optional
+
+
+def estimate_size(configurations: Optional[Mapping[str, Any]]) -> int:
+    """
+    Estimate the size of the configurations in bytes from the lengths of their
+    keys and values
+    """
+    if not configurations:
+        return 0
+    return sum(
+        len(key) + len(value if isinstance(value, str) else str(value))
+        for key, value in configurations.items()
+    )
+
+
+class NamespaceBudget:
+    """Sizes of the loaded namespaces, least recently used first"""
+
+    def __init__(self, memory_budget: Optional[int] = None):
+        """
+        Initialize method
+
+        Args:
+            memory_budget: Bound of the total estimated size of the loaded
+                namespaces in bytes, None for no bound
+        """
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+
+    def __contains__(self, namespace: str) -> bool:
+        return namespace in self._sizes
+
+    @property
+    def namespaces(self) -> List[str]:
+        """
+        The loaded namespaces, least recently used first
+        """
+        with self._lock:
+            return list(self._sizes)
+
+    @property
+    def total_size(self) -> int:
+        """
+        The total estimated size of the loaded namespaces
+        """
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def touch(self, namespace: str) -> None:
+        """
+        Mark the loaded namespace as the most recently used
+        """
+        with self._lock:
+            if namespace in self._sizes:
+                self._sizes.move_to_end(namespace)
+
+    def add(self, namespace: str, size: int, keep: Collection[str] = ()) -> List[str]:
+        """
+        Record the size of the loaded namespace as the most recently used one
+
+        Returns:
+            The least recently used namespaces to evict to stay within the
+            budget, never the added namespace nor the ones in keep
+        """
+        with self._lock:
+            self._sizes[namespace] = size
+            self._sizes.move_to_end(namespace)
+            if self.memory_budget is None:
+                return []
+            total = sum(self._sizes.values())
+            evicted = []
+            for candidate in list(self._sizes):
+                if total <= self.memory_budget:
+                    break
+                if candidate == namespace or candidate in keep:
+                    continue
+                total -= self._sizes.pop(candidate)
+                evicted.append(candidate)
+            return evicted
+
+    def remove(self, namespace: str) -> None:
+        """
+        Forget the namespace
+        """
+        with self._lock:
+            self._sizes.pop(namespace, None)
+
+    def _reset_after_fork(self) -> None:
+        """
+        Recreate the lock, a polling thread of the parent may have held it
+        """
+        self._lock = threading.Lock()
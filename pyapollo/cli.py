@@ -0,0 +1,160 @@
+"""
+Command line interface of pyapollo.
+
+    pyapollo bake --output DIR [--meta-server-address URL] [--app-id ID] ...
+    pyapollo soak [--sync-clients N] [--async-clients N] [--duration SECONDS] ...
+
+`bake` fetches every namespace of an app, cluster and env and writes them to a
+snapshot directory that clients boot from with snapshot_dir_path, e.g. one
+baked into a container image at build time. Options that are not given are
+read from the APOLLO_ environment variables like ApolloSettingsConfig.
+
+`soak` runs many clients against a local stand-in server and prints a sample
+of threads, file descriptors, RSS, request rate and refresh latency at every
+interval, see pyapollo.soak.
+"""
+
+import os
+import sys
+import argparse
+from typing import List, Optional
+
+from pyapollo.client import ApolloClient
+from pyapollo.codec import get_codec
+from pyapollo.settings import ApolloSettingsConfig
+from pyapollo.snapshot import seal_snapshot
+from pyapollo.soak import SoakSample, run_soak
+
+BAKE_OPTIONS = (
+    "meta_server_address",
+    "app_id",
+    "app_secret",
+    "cluster",
+    "env",
+    "namespaces",
+    "timeout",
+    "cache_file_compression",
+    "json_codec",
+)
+
+
+def bake(args: argparse.Namespace) -> int:
+    """
+    Bake the snapshot of the namespaces into the output directory
+    """
+    overrides = {
+        option: getattr(args, option)
+        for option in BAKE_OPTIONS
+        if getattr(args, option) is not None
+    }
+    if args.app_secret is not None:
+        overrides["using_app_secret"] = True
+    os.makedirs(args.output, exist_ok=True)
+    settings = ApolloSettingsConfig(
+        **overrides, cache_file_dir_path=args.output, snapshot_dir_path=None
+    )
+
+    # The client writes the cache files and the manifest of the app
+    client = ApolloClient(settings=settings)
+    client.close()
+    missing = [
+        namespace
+        for namespace in settings.namespaces
+        if client.get_config_age(namespace) is None
+    ]
+    if missing:
+        print(f"Failed to fetch namespaces: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    manifest = seal_snapshot(
+        args.output,
+        settings.app_id,
+        settings.cluster,
+        settings.env,
+        get_codec(settings.json_codec),
+    )
+    for namespace in settings.namespaces:
+        entry = manifest["namespaces"][namespace]
+        print(f"{namespace}\t{entry['release_key']}\t{entry['sha256']}")
+    return 0
+
+
+def soak(args: argparse.Namespace) -> int:
+    """
+    Run the soak test and print the samples as tab-separated lines
+    """
+    print("\t".join(SoakSample._fields), flush=True)
+
+    def print_sample(sample: SoakSample) -> None:
+        values = [
+            (
+                "-"
+                if value is None
+                else f"{value:.3f}" if isinstance(value, float) else str(value)
+            )
+            for value in sample
+        ]
+        print("\t".join(values), flush=True)
+
+    run_soak(
+        sync_clients=args.sync_clients,
+        async_clients=args.async_clients,
+        namespaces=args.namespaces,
+        keys=args.keys,
+        duration=args.duration,
+        sample_interval=args.sample_interval,
+        publish_interval=args.publish_interval,
+        cycle_time=args.cycle_time,
+        fetch_strategy=args.fetch_strategy,
+        on_sample=print_sample,
+    )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the pyapollo command
+    """
+    parser = argparse.ArgumentParser(prog="pyapollo")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    bake_parser = subparsers.add_parser(
+        "bake", help="Write a snapshot of the namespaces of an app to a directory"
+    )
+    bake_parser.add_argument("--output", required=True, help="Snapshot directory")
+    bake_parser.add_argument("--meta-server-address")
+    bake_parser.add_argument("--app-id")
+    bake_parser.add_argument("--app-secret")
+    bake_parser.add_argument("--cluster")
+    bake_parser.add_argument("--env")
+    bake_parser.add_argument("--namespaces", help="Comma-separated list")
+    bake_parser.add_argument("--timeout", type=int)
+    bake_parser.add_argument("--cache-file-compression", choices=["zlib", "zstd"])
+    bake_parser.add_argument(
+        "--json-codec", choices=["auto", "orjson", "msgspec", "json"]
+    )
+    bake_parser.set_defaults(func=bake)
+
+    soak_parser = subparsers.add_parser(
+        "soak", help="Run many clients against a local stand-in server"
+    )
+    soak_parser.add_argument("--sync-clients", type=int, default=10)
+    soak_parser.add_argument("--async-clients", type=int, default=10)
+    soak_parser.add_argument("--namespaces", type=int, default=3)
+    soak_parser.add_argument("--keys", type=int, default=20)
+    soak_parser.add_argument("--duration", type=float, default=60.0)
+    soak_parser.add_argument("--sample-interval", type=float, default=10.0)
+    soak_parser.add_argument("--publish-interval", type=float, default=1.0)
+    soak_parser.add_argument("--cycle-time", type=int, default=5)
+    soak_parser.add_argument(
+        "--fetch-strategy", choices=["configs", "configfiles"], default="configs"
+    )
+    soak_parser.set_defaults(func=soak)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
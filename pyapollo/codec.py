@@ -0,0 +1,95 @@
+"""
+JSON codecs used for responses, cache files and JSON values.
+
+The default codec is the fastest backend that is installed: orjson, then
+msgspec, then the standard library json module. Every codec decodes from bytes
+or str, encodes to UTF-8 bytes and raises ValueError on invalid input.
+"""
+
+import json
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+class JSONCodec:
+    """JSON codec based on the standard library json module"""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode the JSON document
+
+        Raises:
+            ValueError: If the document is not valid JSON
+        """
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encode the object to a UTF-8 JSON document
+        """
+        return json.dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec based on orjson"""
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class MsgspecCodec(JSONCodec):
+    """JSON codec based on msgspec"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+_CODEC_CLASSES: Dict[str, type] = {"json": JSONCodec}
+if orjson is not None:
+    _CODEC_CLASSES["orjson"] = OrjsonCodec
+if msgspec is not None:
+    _CODEC_CLASSES["msgspec"] = MsgspecCodec
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Get the JSON codec by name, None or 'auto' selects the fastest installed one
+
+    Raises:
+        ValueError: If the codec is unknown or its package is not installed
+    """
+    if name is None or name == "auto":
+        for candidate in ("orjson", "msgspec", "json"):
+            if candidate in _CODEC_CLASSES:
+                return _CODEC_CLASSES[candidate]()
+    if name not in _CODEC_CLASSES:
+        raise ValueError(f"JSON codec {name} is unknown or not installed")
+    return _CODEC_CLASSES[name]()
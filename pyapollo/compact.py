@@ -0,0 +1,120 @@
+"""
+Compact in-memory storage for large namespaces.
+
+A compact namespace stores its configurations as two parallel tuples of sorted
+keys and values instead of a dict, which removes the per-entry hash table
+overhead. When a new release is built from the previous one every unchanged
+key and value object is shared with the previous release, so a refresh that
+changes a few keys does not keep a second copy of the rest. Keys are not added
+to the interpreter-wide intern table, which would cost more memory than it
+saves for keys that only live in one namespace.
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional, Tuple
+
+_MISSING = object()
+
+
+class CompactNamespace(Mapping):
+    """Read-only namespace snapshot backed by sorted key and value tuples"""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: Tuple[str, ...], values: Tuple[Any, ...]):
+        self._keys = keys
+        self._values = values
+
+    @classmethod
+    def build(
+        cls, data: Mapping, previous: Optional["CompactNamespace"] = None
+    ) -> "CompactNamespace":
+        """
+        Build a compact namespace from the configurations
+
+        Unchanged keys and values are shared with the previous release, and the
+        previous release itself is returned when nothing changed.
+        """
+        items = sorted(data.items())
+        if previous is None:
+            return cls(
+                tuple(key for key, _ in items),
+                tuple(value for _, value in items),
+            )
+
+        previous_keys, previous_values = previous._keys, previous._values
+        previous_size = len(previous_keys)
+        keys = []
+        values = []
+        shared = 0
+        position = 0
+        for key, value in items:
+            # Both sides are sorted, walk them together to find the previous entry
+            while position < previous_size and previous_keys[position] < key:
+                position += 1
+            if position < previous_size and previous_keys[position] == key:
+                key = previous_keys[position]
+                previous_value = previous_values[position]
+                if previous_value == value:
+                    value = previous_value
+                    shared += 1
+            keys.append(key)
+            values.append(value)
+
+        if shared == len(items) == previous_size:
+            return previous
+        return cls(tuple(keys), tuple(values))
+
+    @property
+    def sorted_keys(self) -> Tuple[str, ...]:
+        """
+        Get the keys in sorted order
+        """
+        return self._keys
+
+    def _find(self, key: Any) -> int:
+        position = bisect_left(self._keys, key) if isinstance(key, str) else -1
+        if 0 <= position < len(self._keys) and self._keys[position] == key:
+            return position
+        return -1
+
+    def __getitem__(self, key: str) -> Any:
+        position = self._find(key)
+        if position < 0:
+            raise KeyError(key)
+        return self._values[position]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self._find(key)
+        if position < 0:
+            return default
+        return self._values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __eq__(self, other: object) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, CompactNamespace):
+            return self._keys == other._keys and self._values == other._values
+        if isinstance(other, Mapping):
+            if len(other) != len(self._keys):
+                return False
+            for key, value in zip(self._keys, self._values):
+                if other.get(key, _MISSING) != value:
+                    return False
+            return True
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
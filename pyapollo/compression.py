@@ -0,0 +1,76 @@
+"""
+Compression of the local configuration cache files.
+
+Cache files are written either as plain JSON text or compressed with zlib, or
+with zstd when the optional `zstandard` package is installed. Reading detects
+the format from the file content, so files written with any setting, including
+the plain files of older versions, can always be read back.
+"""
+
+import zlib
+from typing import Optional
+
+from loguru import logger
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSION_METHODS = ("zlib", "zstd")
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class DecompressionError(ValueError):
+    """Raised when a compressed cache file is corrupted"""
+
+
+def resolve_compression(method: Optional[str]) -> Optional[str]:
+    """
+    Get the compression method that is usable in this environment
+
+    zstd falls back to zlib when the zstandard package is not installed.
+    """
+    if method == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, compress cache files with zlib")
+        return "zlib"
+    return method
+
+
+def compress(data: bytes, method: Optional[str]) -> bytes:
+    """
+    Compress the data with the method, None keeps the data as is
+    """
+    if method == "zlib":
+        return zlib.compress(data)
+    if method == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def _is_zlib(data: bytes) -> bool:
+    return len(data) >= 2 and data[0] & 0x0F == 8 and (data[0] << 8 | data[1]) % 31 == 0
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Decompress the data, the format is detected from its header
+
+    Raises:
+        DecompressionError: If the data is compressed but cannot be decompressed
+    """
+    try:
+        if data.startswith(_ZSTD_MAGIC):
+            if zstandard is None:
+                raise DecompressionError(
+                    "zstandard is required to read zstd compressed cache files"
+                )
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        if _is_zlib(data):
+            return zlib.decompress(data)
+    except DecompressionError:
+        raise
+    except Exception as e:
+        raise DecompressionError(str(e)) from e
+    return data
@@ -5,8 +5,13 @@ This module contains the exceptions class used in the project.
 
 class BasicException(BaseException):
     def __init__(self, msg: str):
+        super().__init__(msg)
         self._msg = msg
 
 
 class ServerNotResponseException(BasicException):
     pass
+
+
+class StaleConfigException(BasicException):
+    pass
@@ -0,0 +1,84 @@
+"""
+Bounded in-memory history of namespace releases.
+
+The clients keep the last few snapshots of every namespace with their release
+keys, so an operator can pin a namespace back to a previous release locally
+without waiting for a rollback in Apollo and a polling cycle.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Mapping, NamedTuple, Optional
+
+
+class ReleaseSnapshot(NamedTuple):
+    """Snapshot of a namespace release"""
+
+    release_key: Optional[str]
+    configurations: Mapping
+    timestamp: float
+
+
+class ReleaseHistory:
+    """Ring of the last releases of every namespace"""
+
+    def __init__(self, size: int = 5):
+        """
+        Initialize method
+
+        Args:
+            size: Number of releases kept per namespace, 0 disables the history
+        """
+        self.size = size
+        self._lock = threading.Lock()
+        self._releases: Dict[str, Deque[ReleaseSnapshot]] = {}
+
+    def record(
+        self, namespace: str, release_key: Optional[str], configurations: Mapping
+    ) -> None:
+        """
+        Record the release of the namespace unless it is already the latest one
+        """
+        if self.size <= 0:
+            return
+        with self._lock:
+            releases = self._releases.get(namespace)
+            if releases is None:
+                releases = self._releases[namespace] = deque(maxlen=self.size)
+            if releases:
+                latest = releases[-1]
+                if (
+                    latest.release_key == release_key
+                    or latest.configurations is configurations
+                ):
+                    return
+            releases.append(ReleaseSnapshot(release_key, configurations, time.time()))
+
+    def get(self, namespace: str) -> List[ReleaseSnapshot]:
+        """
+        Get the recorded releases of the namespace, newest first
+        """
+        with self._lock:
+            return list(reversed(self._releases.get(namespace, ())))
+
+    def find(
+        self, namespace: str, release_key: Optional[str] = None
+    ) -> Optional[ReleaseSnapshot]:
+        """
+        Find the release of the namespace with the release key, None finds the
+        release before the latest one
+        """
+        releases = self.get(namespace)
+        if release_key is None:
+            return releases[1] if len(releases) > 1 else None
+        for release in releases:
+            if release.release_key == release_key:
+                return release
+        return None
+
+    def _reset_after_fork(self) -> None:
+        """
+        Recreate the lock, a polling thread of the parent may have held it
+        """
+        self._lock = threading.Lock()
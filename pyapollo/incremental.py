@@ -0,0 +1,62 @@
+"""
+Incremental configuration sync.
+
+A client sends the release key of its snapshot of a namespace with every
+/configs request. Apollo server answers 304 when the release is unchanged, and
+from Apollo 2.3 with incremental sync enabled it answers with the changes since
+that release instead of the whole namespace:
+
+    {
+        "releaseKey": "...",
+        "configSyncType": "IncrementalSync",
+        "configurationChanges": [
+            {"key": "k", "newValue": "v", "configurationChangeType": "MODIFIED"}
+        ]
+    }
+
+The changes are applied to the current snapshot. Any other sync type, e.g.
+"FullSync", carries the whole namespace. A response the client cannot apply
+makes it fall back to a full sync without release key.
+"""
+
+from typing import Any, Dict, Iterable, Mapping
+
+FULL_SYNC = "FullSync"
+INCREMENTAL_SYNC = "IncrementalSync"
+
+CHANGE_ADDED = "ADDED"
+CHANGE_MODIFIED = "MODIFIED"
+CHANGE_DELETED = "DELETED"
+
+
+def is_incremental(data: Mapping[str, Any]) -> bool:
+    """
+    Check whether the /configs response is an incremental sync, a missing or
+    unknown sync type is a full sync
+    """
+    return data.get("configSyncType") == INCREMENTAL_SYNC
+
+
+def apply_changes(
+    configurations: Mapping[str, str], changes: Iterable[Mapping[str, Any]]
+) -> Dict[str, str]:
+    """
+    Apply the configuration changes of an incremental sync to a copy of the
+    configurations
+
+    Raises:
+        ValueError: If a change has no key or an unknown change type
+    """
+    result = dict(configurations)
+    for change in changes:
+        key = change.get("key")
+        if key is None:
+            raise ValueError("configuration change without key")
+        change_type = change.get("configurationChangeType")
+        if change_type in (CHANGE_ADDED, CHANGE_MODIFIED):
+            result[key] = change.get("newValue")
+        elif change_type == CHANGE_DELETED:
+            result.pop(key, None)
+        else:
+            raise ValueError(f"unknown configurationChangeType {change_type}")
+    return result
@@ -0,0 +1,92 @@
+"""
+Sorted key index for namespace snapshots.
+
+The index keeps the keys of one snapshot in sorted order so that prefix and
+range queries cost O(log n + k) instead of scanning the whole namespace. The
+views returned by the index read through to the snapshot without copying it.
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional, Sequence
+
+from pyapollo.compact import CompactNamespace
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Get the smallest string that is greater than every string with the prefix,
+    None if there is no such string
+    """
+
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class KeyRangeView(Mapping):
+    """Read-only view of a contiguous range of sorted snapshot keys"""
+
+    __slots__ = ("_snapshot", "_keys", "_start", "_stop")
+
+    def __init__(self, snapshot: Mapping, keys: Sequence[str], start: int, stop: int):
+        self._snapshot = snapshot
+        self._keys = keys
+        self._start = start
+        self._stop = max(start, stop)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return self._snapshot[key]
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        position = bisect_left(self._keys, key, self._start, self._stop)
+        return position < self._stop and self._keys[position] == key
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._keys
+        for position in range(self._start, self._stop):
+            yield keys[position]
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+class KeyIndex:
+    """Sorted keys of one namespace snapshot"""
+
+    __slots__ = ("snapshot", "keys")
+
+    def __init__(self, snapshot: Mapping):
+        self.snapshot = snapshot
+        if isinstance(snapshot, CompactNamespace):
+            self.keys = snapshot.sorted_keys
+        else:
+            self.keys = sorted(snapshot)
+
+    def range(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> KeyRangeView:
+        """
+        Get the view of the keys k with start <= k < end, an omitted bound is open
+        """
+
+        lo = 0 if start is None else bisect_left(self.keys, start)
+        hi = len(self.keys) if end is None else bisect_left(self.keys, end)
+        return KeyRangeView(self.snapshot, self.keys, lo, hi)
+
+    def prefix(self, prefix: str) -> KeyRangeView:
+        """
+        Get the view of the keys starting with the prefix
+        """
+
+        return self.range(prefix or None, _prefix_upper_bound(prefix))
@@ -0,0 +1,138 @@
+"""
+Meta server discovery over several addresses.
+
+meta_server_address may list several meta servers separated by commas. The
+first discovery queries all of them in parallel and takes the first valid
+answer, so one slow or unhealthy meta server does not delay startup. The
+fastest address is remembered and queried alone on the next refreshes, until
+it fails and the addresses are raced again.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from loguru import logger
+
+from pyapollo.exceptions import ServerNotResponseException
+
+
+def split_meta_server_addresses(meta_server_address: Optional[str]) -> List[str]:
+    """
+    Split the comma-separated meta server addresses, without trailing slashes
+    """
+    return [
+        address.strip().rstrip("/")
+        for address in (meta_server_address or "").split(",")
+        if address.strip()
+    ]
+
+
+def race(fn: Callable[[str], Any], addresses: List[str]) -> Tuple[str, Any]:
+    """
+    Call fn with every address in parallel threads, return the first address
+    answering without error and its result
+
+    Raises:
+        The error of the last address if every address failed
+    """
+    executor = ThreadPoolExecutor(max_workers=len(addresses))
+    futures = {executor.submit(fn, address): address for address in addresses}
+    try:
+        error = None
+        for future in as_completed(futures):
+            try:
+                return futures[future], future.result()
+            except (Exception, ServerNotResponseException) as e:
+                error = e
+        raise error
+    finally:
+        # Do not wait for the slower addresses
+        executor.shutdown(wait=False)
+
+
+async def race_async(
+    fn: Callable[[str], Awaitable[Any]], addresses: List[str]
+) -> Tuple[str, Any]:
+    """
+    Await fn with every address concurrently, return the first address
+    answering without error and its result, the other calls are cancelled
+
+    Raises:
+        The error of the last address if every address failed
+    """
+    tasks = {asyncio.ensure_future(fn(address)): address for address in addresses}
+    try:
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return tasks[task], task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class MetaServers:
+    """Meta server addresses of a client and the fastest one"""
+
+    def __init__(self, meta_server_address: Optional[str]):
+        """
+        Initialize method
+
+        Args:
+            meta_server_address: Comma-separated meta server addresses
+        """
+        self.addresses = split_meta_server_addresses(meta_server_address)
+        self.fastest: Optional[str] = None
+
+    def _forget_fastest(self, error: BaseException) -> None:
+        logger.warning(
+            f"Query meta server {self.fastest} failed, error: {error}, "
+            f"race the meta servers {self.addresses}"
+        )
+        self.fastest = None
+
+    def _record_fastest(self, address: str) -> None:
+        self.fastest = address
+        logger.info(f"Use the fastest meta server {address}")
+
+    def query(self, fn: Callable[[str], Any]) -> Any:
+        """
+        Call fn with the fastest address, or race the addresses to find it
+        """
+        if self.fastest is not None:
+            try:
+                return fn(self.fastest)
+            except (Exception, ServerNotResponseException) as e:
+                self._forget_fastest(e)
+        if not self.addresses:
+            raise ValueError("No meta server address")
+        if len(self.addresses) == 1:
+            return fn(self.addresses[0])
+        address, result = race(fn, self.addresses)
+        self._record_fastest(address)
+        return result
+
+    async def query_async(self, fn: Callable[[str], Awaitable[Any]]) -> Any:
+        """
+        Await fn with the fastest address, or race the addresses to find it
+        """
+        if self.fastest is not None:
+            try:
+                return await fn(self.fastest)
+            except (Exception, ServerNotResponseException) as e:
+                self._forget_fastest(e)
+        if not self.addresses:
+            raise ValueError("No meta server address")
+        if len(self.addresses) == 1:
+            return await fn(self.addresses[0])
+        address, result = await race_async(fn, self.addresses)
+        self._record_fastest(address)
+        return result
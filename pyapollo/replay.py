@@ -0,0 +1,297 @@
+"""
+Recording and deterministic replay of the apollo server traffic.
+
+A recording transport wraps the transport of a client and appends every
+request it sends to a JSON lines file: the url and params, the status code and
+body of the response or the connection error, and the latency. The config
+service lookups, namespace fetches and notification polls of the client all go
+through its transport.
+
+A replay transport serves a recording without any apollo server. The
+responses of every url path are served in the recorded order, the last one is
+repeated once they are used up, and the recorded latencies are replayed
+divided by speed, or not at all. A client replaying a recording with a short
+cycle time reproduces a refresh storm offline, e.g. to measure its CPU and
+memory usage:
+
+    recorder = RecordingTransport(get_transport(), "apollo-traffic.jsonl")
+    client = ApolloClient(..., transport=recorder)
+
+    replay = ReplayTransport("apollo-traffic.jsonl", speed=10)
+    client = ApolloClient(..., cycle_time=1, transport=replay)
+
+Request headers are never recorded, they carry the signature of the app secret.
+"""
+
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+from urllib.parse import urlparse
+from typing import Any, Deque, Dict, NamedTuple, Optional
+
+from pyapollo.exceptions import ServerNotResponseException
+from pyapollo.transport import AsyncTransport, Transport, TransportResponse
+
+
+class RecordedResponse(NamedTuple):
+    """Response of a recorded request, error is set for a connection error"""
+
+    status_code: int
+    content: bytes
+    error: Optional[str]
+    elapsed: float
+
+
+class _Recorder:
+    """Writer of the recorded requests of a transport"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._started_at = time.monotonic()
+
+    def write(
+        self,
+        url: str,
+        params: Optional[Dict],
+        started_at: float,
+        response: Optional[TransportResponse],
+        error: Optional[BaseException],
+    ) -> None:
+        record: Dict[str, Any] = {
+            "time": round(started_at - self._started_at, 6),
+            "elapsed": round(time.monotonic() - started_at, 6),
+            "url": url,
+            "params": params,
+        }
+        if response is not None:
+            record["status_code"] = response.status_code
+            record["body"] = response.text
+        else:
+            record["error"] = str(error)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RecordingTransport(Transport):
+    """Sync transport recording the requests sent through another transport"""
+
+    def __init__(self, transport: Transport, path: str):
+        """
+        Initialize method
+
+        Args:
+            transport: The transport sending the requests
+            path: JSON lines file the requests are appended to
+        """
+        super().__init__()
+        self.name = transport.name
+        self._transport = transport
+        self._recorder = _Recorder(path)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        started_at = time.monotonic()
+        try:
+            response = self._transport.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        except ServerNotResponseException as e:
+            self._recorder.write(url, params, started_at, None, e)
+            raise
+        self._recorder.write(url, params, started_at, response, None)
+        return response
+
+    def close(self) -> None:
+        """
+        Close the recording file, the wrapped transport is left open
+        """
+        self._recorder.close()
+
+    def _reset_after_fork(self) -> None:
+        pass  # The wrapped transport resets itself
+
+
+class AsyncRecordingTransport(AsyncTransport):
+    """Async transport recording the requests sent through another transport"""
+
+    def __init__(self, transport: AsyncTransport, path: str):
+        """
+        Initialize method
+
+        Args:
+            transport: The transport sending the requests
+            path: JSON lines file the requests are appended to
+        """
+        super().__init__()
+        self.name = transport.name
+        self._transport = transport
+        self._recorder = _Recorder(path)
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        started_at = time.monotonic()
+        try:
+            response = await self._transport.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        except ServerNotResponseException as e:
+            self._recorder.write(url, params, started_at, None, e)
+            raise
+        self._recorder.write(url, params, started_at, response, None)
+        return response
+
+    async def close(self) -> None:
+        """
+        Close the recording file, the wrapped transport is left open
+        """
+        self._recorder.close()
+
+    def _reset_after_fork(self) -> None:
+        pass  # The wrapped transport resets itself
+
+
+class Recording:
+    """Recorded responses by url path, served in the recorded order"""
+
+    def __init__(self, path: str):
+        """
+        Initialize method
+
+        Args:
+            path: JSON lines file written by a recording transport
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If a line is not a recorded request
+        """
+        self._lock = threading.Lock()
+        self._responses: Dict[str, Deque[RecordedResponse]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = RecordedResponse(
+                    status_code=record.get("status_code", 0),
+                    content=record.get("body", "").encode("utf-8"),
+                    error=record.get("error"),
+                    elapsed=record.get("elapsed", 0.0),
+                )
+                path_key = urlparse(record.get("url", "")).path
+                self._responses.setdefault(path_key, deque()).append(response)
+
+    def next_response(self, url: str) -> RecordedResponse:
+        """
+        Get the next recorded response of the url path, the last one is repeated
+
+        Raises:
+            ServerNotResponseException: If no request to the url path was recorded
+        """
+        with self._lock:
+            responses = self._responses.get(urlparse(url).path)
+            if not responses:
+                raise ServerNotResponseException(f"No recorded response for {url}.")
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
+
+
+def _to_transport_response(response: RecordedResponse) -> TransportResponse:
+    if response.error is not None:
+        raise ServerNotResponseException(response.error)
+    return TransportResponse(response.status_code, response.content)
+
+
+class ReplayTransport(Transport):
+    """Sync transport serving a recording instead of sending requests"""
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0):
+        """
+        Initialize method
+
+        Args:
+            path: JSON lines file written by a recording transport
+            speed: Factor the recorded latencies are divided by, None replays
+                the responses without any delay
+        """
+        super().__init__()
+        self.speed = speed
+        self._recording = Recording(path)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        response = self._recording.next_response(url)
+        if self.speed:
+            time.sleep(response.elapsed / self.speed)
+        return _to_transport_response(response)
+
+    def close(self) -> None:
+        pass
+
+    def _reset_after_fork(self) -> None:
+        pass
+
+
+class AsyncReplayTransport(AsyncTransport):
+    """Async transport serving a recording instead of sending requests"""
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0):
+        """
+        Initialize method
+
+        Args:
+            path: JSON lines file written by a recording transport
+            speed: Factor the recorded latencies are divided by, None replays
+                the responses without any delay
+        """
+        super().__init__()
+        self.speed = speed
+        self._recording = Recording(path)
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        response = self._recording.next_response(url)
+        if self.speed:
+            await asyncio.sleep(response.elapsed / self.speed)
+        return _to_transport_response(response)
+
+    async def close(self) -> None:
+        pass
+
+    def _reset_after_fork(self) -> None:
+        pass
@@ -0,0 +1,199 @@
+"""
+DNS cache shared by the clients.
+
+The meta server and config service hosts are resolved through a process-wide
+cache instead of on every new connection. Addresses are reused for ttl seconds,
+and when a lookup fails the last addresses resolved for the host are used
+again, however old they are, so a DNS outage does not stop configuration
+refreshes from the hosts that are still reachable.
+
+The requests transport connects through DNSCache.create_connection, the
+aiohttp transport through CachingResolver.
+"""
+
+import time
+import socket
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from aiohttp.abc import AbstractResolver
+from loguru import logger
+from urllib3.util import connection
+
+DEFAULT_DNS_CACHE_TTL = 60.0
+
+_NUMERIC_SOCKET_FLAGS = socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+
+
+class _DNSEntry(NamedTuple):
+    addresses: List[Tuple]
+    resolved_at: float
+
+
+class DNSCache:
+    """getaddrinfo results cached with a TTL, served stale on lookup errors"""
+
+    def __init__(self, ttl: float = DEFAULT_DNS_CACHE_TTL):
+        """
+        Initialize method
+
+        Args:
+            ttl: Seconds the addresses of a host are reused, 0 resolves the host
+                on every connection but still falls back to the last addresses
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple, _DNSEntry] = {}
+
+    def _lookup(self, key: Tuple) -> Tuple[Optional[_DNSEntry], bool]:
+        entry = self._entries.get(key)
+        fresh = entry is not None and time.monotonic() - entry.resolved_at < self.ttl
+        return entry, fresh
+
+    def _store(self, key: Tuple, addresses: List[Tuple]) -> List[Tuple]:
+        self._entries[key] = _DNSEntry(addresses, time.monotonic())
+        return addresses
+
+    def _fall_back(
+        self, key: Tuple, entry: Optional[_DNSEntry], error: socket.gaierror
+    ) -> List[Tuple]:
+        if entry is None:
+            raise error
+        logger.warning(
+            f"Resolve {key[0]} failed, error: {error}, use the addresses resolved "
+            f"{time.monotonic() - entry.resolved_at:.0f}s ago"
+        )
+        return entry.addresses
+
+    def getaddrinfo(
+        self,
+        host: str,
+        port: Any,
+        family: int = 0,
+        type: int = socket.SOCK_STREAM,
+        flags: int = 0,
+    ) -> List[Tuple]:
+        """
+        Resolve the host like socket.getaddrinfo
+
+        Raises:
+            socket.gaierror: If the lookup failed and the host was never resolved
+        """
+        key = (host, port, family, type, flags)
+        entry, fresh = self._lookup(key)
+        if fresh:
+            return entry.addresses
+        try:
+            addresses = socket.getaddrinfo(host, port, family, type, 0, flags)
+        except socket.gaierror as e:
+            return self._fall_back(key, entry, e)
+        return self._store(key, addresses)
+
+    async def getaddrinfo_async(
+        self,
+        host: str,
+        port: Any,
+        family: int = 0,
+        type: int = socket.SOCK_STREAM,
+        flags: int = 0,
+    ) -> List[Tuple]:
+        """
+        Resolve the host in the executor of the running event loop
+
+        Raises:
+            socket.gaierror: If the lookup failed and the host was never resolved
+        """
+        key = (host, port, family, type, flags)
+        entry, fresh = self._lookup(key)
+        if fresh:
+            return entry.addresses
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                host, port, family=family, type=type, flags=flags
+            )
+        except socket.gaierror as e:
+            return self._fall_back(key, entry, e)
+        return self._store(key, addresses)
+
+    def create_connection(
+        self,
+        address: Tuple[str, int],
+        timeout: Any = socket._GLOBAL_DEFAULT_TIMEOUT,
+        source_address: Optional[Tuple[str, int]] = None,
+        socket_options: Optional[List] = None,
+    ) -> socket.socket:
+        """
+        Connect to the first reachable address of the host, like
+        urllib3.util.connection.create_connection
+
+        Raises:
+            socket.gaierror: If the host cannot be resolved
+            OSError: If no address of the host is reachable
+        """
+        host, port = address
+        if host.startswith("["):
+            host = host.strip("[]")
+        error = None
+        for _, _, _, _, sockaddr in self.getaddrinfo(
+            host, port, connection.allowed_gai_family(), socket.SOCK_STREAM
+        ):
+            try:
+                return connection.create_connection(
+                    (sockaddr[0], port),
+                    timeout,
+                    source_address=source_address,
+                    socket_options=socket_options,
+                )
+            except OSError as e:
+                error = e
+        if error is not None:
+            raise error
+        raise OSError("getaddrinfo returns an empty list")
+
+    def clear(self) -> None:
+        """
+        Forget every resolved address
+        """
+        self._entries.clear()
+
+
+dns_cache = DNSCache()
+
+
+class CachingResolver(AbstractResolver):
+    """aiohttp resolver reading the addresses from a DNS cache"""
+
+    def __init__(self, cache: Optional[DNSCache] = None):
+        self._cache = dns_cache if cache is None else cache
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        infos = await self._cache.getaddrinfo_async(
+            host, port, family=family, type=socket.SOCK_STREAM
+        )
+        hosts = []
+        for family, _, proto, _, address in infos:
+            if family == socket.AF_INET6:
+                if len(address) < 3:
+                    # IPv6 is not supported by this Python build
+                    continue
+                if address[3]:
+                    # Keep the scope id of link-local addresses
+                    resolved_host, resolved_port = socket.getnameinfo(
+                        address, socket.NI_NUMERICHOST | socket.NI_NUMERICSERV
+                    )
+                    address = (resolved_host, int(resolved_port))
+            hosts.append(
+                {
+                    "hostname": host,
+                    "host": address[0],
+                    "port": address[1],
+                    "family": family,
+                    "proto": proto,
+                    "flags": _NUMERIC_SOCKET_FLAGS,
+                }
+            )
+        return hosts
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,134 @@
+"""
+Polling schedule of the namespaces.
+
+Clients started together would otherwise poll apollo server at the same
+moments forever. The schedule spreads the first poll of every client over a
+startup window and adds random jitter to every interval. Each namespace also
+has its own adaptive interval: it is reset to the minimum cycle time when the
+namespace changes and doubles up to the maximum cycle time while it does not.
+"""
+
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+BACKOFF_FACTOR = 2.0
+
+
+class PollSchedule:
+    """Adaptive, jittered polling intervals by namespace"""
+
+    def __init__(
+        self,
+        cycle_time: float,
+        min_cycle_time: Optional[float] = None,
+        max_cycle_time: Optional[float] = None,
+        jitter: float = 0.0,
+        startup_spread: float = 0.0,
+    ):
+        """
+        Initialize method
+
+        Args:
+            cycle_time: Initial polling interval of every namespace in seconds
+            min_cycle_time: Interval after a namespace changed, defaults to cycle_time
+            max_cycle_time: Bound of the interval of unchanged namespaces, defaults
+                to cycle_time
+            jitter: Fraction of the interval added or removed at random
+            startup_spread: Seconds over which the first polls are spread
+
+        Raises:
+            ValueError: If the minimum cycle time is above the maximum one
+        """
+        self.min_cycle_time = cycle_time if min_cycle_time is None else min_cycle_time
+        self.max_cycle_time = cycle_time if max_cycle_time is None else max_cycle_time
+        if self.min_cycle_time > self.max_cycle_time:
+            raise ValueError("min_cycle_time must not be above max_cycle_time")
+        self.cycle_time = min(max(cycle_time, self.min_cycle_time), self.max_cycle_time)
+        self.jitter = jitter
+        self.startup_spread = startup_spread
+        self._intervals: Dict[str, float] = {}
+        self._next_poll: Dict[str, float] = {}
+
+    def _jittered(self, interval: float) -> float:
+        if not self.jitter:
+            return interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def get_startup_delay(self) -> float:
+        """
+        Get a random delay within the startup spread
+        """
+        return random.uniform(0, self.startup_spread)
+
+    def start(self, namespaces: Iterable[str], now: Optional[float] = None) -> None:
+        """
+        Schedule the first poll of the namespaces loaded at startup
+
+        Namespaces that are not scheduled are due immediately.
+        """
+        now = time.monotonic() if now is None else now
+        self._next_poll.clear()
+        for namespace in namespaces:
+            self.add(namespace, now + self.get_startup_delay())
+
+    def add(self, namespace: str, now: Optional[float] = None) -> None:
+        """
+        Schedule the next poll of a namespace that was just loaded
+        """
+        now = time.monotonic() if now is None else now
+        interval = self._intervals.setdefault(namespace, self.cycle_time)
+        self._next_poll[namespace] = now + self._jittered(interval)
+
+    def remove(self, namespace: str) -> None:
+        """
+        Unschedule the namespace, it is due immediately if it is polled again
+        """
+        self._next_poll.pop(namespace, None)
+
+    def record(
+        self, namespace: str, changed: bool, now: Optional[float] = None
+    ) -> None:
+        """
+        Adapt the interval of the polled namespace and schedule its next poll
+        """
+        now = time.monotonic() if now is None else now
+        if changed:
+            interval = self.min_cycle_time
+        else:
+            interval = min(
+                self._intervals.get(namespace, self.cycle_time) * BACKOFF_FACTOR,
+                self.max_cycle_time,
+            )
+        self._intervals[namespace] = interval
+        self._next_poll[namespace] = now + self._jittered(interval)
+
+    def get_interval(self, namespace: str) -> float:
+        """
+        Get the current polling interval of the namespace, without jitter
+        """
+        return self._intervals.get(namespace, self.cycle_time)
+
+    def due(self, namespaces: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """
+        Get the namespaces whose next poll is due
+        """
+        now = time.monotonic() if now is None else now
+        return [
+            namespace
+            for namespace in namespaces
+            if self._next_poll.get(namespace, now) <= now
+        ]
+
+    def next_wait(
+        self, namespaces: Iterable[str], now: Optional[float] = None
+    ) -> float:
+        """
+        Get the seconds until the next poll of the namespaces is due
+        """
+        now = time.monotonic() if now is None else now
+        next_poll = min(
+            (self._next_poll.get(namespace, now) for namespace in namespaces),
+            default=now + self.cycle_time,
+        )
+        return max(next_poll - now, 0.0)
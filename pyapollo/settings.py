@@ -22,7 +22,7 @@ class ApolloSettingsConfig(BaseSettings):
     3. Direct initialization with parameters
 
     Attributes:
-        meta_server_address: Apollo meta server address.
+        meta_server_address: Apollo meta server addresses, comma-separated.
         app_id: Apollo application ID.
         using_app_secret: Flag to indicate if app_secret is required.
         app_secret: Apollo application secret key.
@@ -33,11 +33,28 @@ class ApolloSettingsConfig(BaseSettings):
         timeout: Request timeout in seconds.
         cycle_time: Configuration refresh cycle time in seconds.
         cache_file_dir_path: Local cache file directory path.
+        fetch_strategy: 'configs' or 'configfiles', the API used to read namespaces.
+        cache_file_compression: 'zlib' or 'zstd' to compress the local cache files.
+        json_codec: 'auto', 'orjson', 'msgspec' or 'json', the JSON codec to use.
+        compact_storage: Flag to store namespaces in the compact in-memory format.
+        max_staleness: Seconds after which a namespace not refreshed is stale.
+        fork_polling: 'all' or 'manual', whether forked children restart polling.
+        history_size: Number of releases kept in memory per namespace.
+        poll_jitter: Fraction of the polling interval added or removed at random.
+        poll_startup_spread: Seconds over which the first poll is spread.
+        min_cycle_time: Polling interval of a namespace after it changed.
+        max_cycle_time: Bound of the polling interval of an unchanged namespace.
+        transport: 'default' or 'httpx', the HTTP transport of the clients.
+        snapshot_dir_path: Directory of a snapshot baked with `pyapollo bake`.
+        access_stats_sample_rate: Fraction of the configuration reads counted.
+        lazy_namespaces: Flag to fetch every namespace on its first read.
+        namespace_memory_budget: Bytes of the namespaces kept in memory in lazy mode.
+        incremental_sync: Flag to send the release keys for 304 and incremental sync.
 
     Environment Variables:
         Configuration can be set using environment variables with the prefix 'APOLLO_'.
         For example:
-        - APOLLO_META_SERVER_ADDRESS=http://localhost:8080
+        - APOLLO_META_SERVER_ADDRESS=http://localhost:8080  # Or a comma-separated list
         - APOLLO_APP_ID=my-app
         - APOLLO_USING_APP_SECRET=true
         - APOLLO_APP_SECRET=your-app-secret
@@ -46,6 +63,23 @@ class ApolloSettingsConfig(BaseSettings):
         - APOLLO_NAMESPACES=application,common,other  # Comma-separated list
         - APOLLO_TIMEOUT=10
         - APOLLO_CYCLE_TIME=30
+        - APOLLO_FETCH_STRATEGY=configfiles
+        - APOLLO_CACHE_FILE_COMPRESSION=zlib
+        - APOLLO_JSON_CODEC=orjson
+        - APOLLO_COMPACT_STORAGE=true
+        - APOLLO_MAX_STALENESS=300
+        - APOLLO_FORK_POLLING=manual
+        - APOLLO_HISTORY_SIZE=5
+        - APOLLO_POLL_JITTER=0.1
+        - APOLLO_POLL_STARTUP_SPREAD=30
+        - APOLLO_MIN_CYCLE_TIME=10
+        - APOLLO_MAX_CYCLE_TIME=300
+        - APOLLO_TRANSPORT=httpx
+        - APOLLO_SNAPSHOT_DIR_PATH=/app/apollo-snapshot
+        - APOLLO_ACCESS_STATS_SAMPLE_RATE=0.01
+        - APOLLO_LAZY_NAMESPACES=true
+        - APOLLO_NAMESPACE_MEMORY_BUDGET=10485760
+        - APOLLO_INCREMENTAL_SYNC=false
 
     .env File Example:
         You can create a .env file with the following content:
@@ -93,6 +127,23 @@ class ApolloSettingsConfig(BaseSettings):
     timeout: int = 10
     cycle_time: int = 30
     cache_file_dir_path: Optional[str] = None
+    fetch_strategy: str = "configs"
+    cache_file_compression: Optional[str] = None
+    json_codec: str = "auto"
+    compact_storage: bool = False
+    max_staleness: Optional[float] = None
+    fork_polling: str = "all"
+    history_size: int = 5
+    poll_jitter: float = 0.1
+    poll_startup_spread: float = 0.0
+    min_cycle_time: Optional[float] = None
+    max_cycle_time: Optional[float] = None
+    transport: str = "default"
+    snapshot_dir_path: Optional[str] = None
+    access_stats_sample_rate: float = 0.0
+    lazy_namespaces: bool = False
+    namespace_memory_budget: Optional[int] = None
+    incremental_sync: bool = True
 
     @field_validator("app_secret")
     @classmethod
@@ -116,6 +167,206 @@ class ApolloSettingsConfig(BaseSettings):
             raise ValueError("app_secret is required when using_app_secret is True")
         return v
 
+    @field_validator("fetch_strategy")
+    @classmethod
+    def validate_fetch_strategy(cls, v: str) -> str:
+        """Validate the fetch strategy.
+
+        Args:
+            v: The fetch strategy to validate.
+
+        Returns:
+            The validated fetch strategy.
+
+        Raises:
+            ValueError: If the fetch strategy is not supported.
+        """
+        if v not in ("configs", "configfiles"):
+            raise ValueError("fetch_strategy must be 'configs' or 'configfiles'")
+        return v
+
+    @field_validator("cache_file_compression")
+    @classmethod
+    def validate_cache_file_compression(cls, v: Optional[str]) -> Optional[str]:
+        """Validate the cache file compression method.
+
+        Args:
+            v: The compression method to validate, empty means no compression.
+
+        Returns:
+            The validated compression method.
+
+        Raises:
+            ValueError: If the compression method is not supported.
+        """
+        if not v:
+            return None
+        if v not in ("zlib", "zstd"):
+            raise ValueError("cache_file_compression must be 'zlib' or 'zstd'")
+        return v
+
+    @field_validator("json_codec")
+    @classmethod
+    def validate_json_codec(cls, v: str) -> str:
+        """Validate the JSON codec name.
+
+        Args:
+            v: The JSON codec name to validate.
+
+        Returns:
+            The validated JSON codec name.
+
+        Raises:
+            ValueError: If the JSON codec is not supported.
+        """
+        if v not in ("auto", "orjson", "msgspec", "json"):
+            raise ValueError("json_codec must be 'auto', 'orjson', 'msgspec' or 'json'")
+        return v
+
+    @field_validator("fork_polling")
+    @classmethod
+    def validate_fork_polling(cls, v: str) -> str:
+        """Validate the polling behaviour of forked child processes.
+
+        Args:
+            v: The fork polling mode to validate.
+
+        Returns:
+            The validated fork polling mode.
+
+        Raises:
+            ValueError: If the fork polling mode is not supported.
+        """
+        if v not in ("all", "manual"):
+            raise ValueError("fork_polling must be 'all' or 'manual'")
+        return v
+
+    @field_validator("history_size")
+    @classmethod
+    def validate_history_size(cls, v: int) -> int:
+        """Validate the number of releases kept per namespace.
+
+        Args:
+            v: The history size to validate.
+
+        Returns:
+            The validated history size.
+
+        Raises:
+            ValueError: If the history size is negative.
+        """
+        if v < 0:
+            raise ValueError("history_size must not be negative")
+        return v
+
+    @field_validator("poll_jitter")
+    @classmethod
+    def validate_poll_jitter(cls, v: float) -> float:
+        """Validate the polling jitter fraction.
+
+        Args:
+            v: The polling jitter fraction to validate.
+
+        Returns:
+            The validated polling jitter fraction.
+
+        Raises:
+            ValueError: If the polling jitter fraction is not between 0 and 1.
+        """
+        if not 0 <= v < 1:
+            raise ValueError("poll_jitter must be between 0 and 1")
+        return v
+
+    @field_validator("poll_startup_spread")
+    @classmethod
+    def validate_poll_startup_spread(cls, v: float) -> float:
+        """Validate the startup spread of the first poll.
+
+        Args:
+            v: The startup spread of the first poll to validate.
+
+        Returns:
+            The validated startup spread of the first poll.
+
+        Raises:
+            ValueError: If the startup spread of the first poll is negative.
+        """
+        if v < 0:
+            raise ValueError("poll_startup_spread must not be negative")
+        return v
+
+    @field_validator("min_cycle_time", "max_cycle_time")
+    @classmethod
+    def validate_cycle_time_bound(cls, v: Optional[float]) -> Optional[float]:
+        """Validate the bounds of the adaptive polling interval.
+
+        Args:
+            v: The polling interval bound to validate, None means cycle_time.
+
+        Returns:
+            The validated polling interval bound.
+
+        Raises:
+            ValueError: If the polling interval bound is not positive.
+        """
+        if v is not None and v <= 0:
+            raise ValueError("min_cycle_time and max_cycle_time must be positive")
+        return v
+
+    @field_validator("transport")
+    @classmethod
+    def validate_transport(cls, v: str) -> str:
+        """Validate the HTTP transport name.
+
+        Args:
+            v: The HTTP transport name to validate.
+
+        Returns:
+            The validated HTTP transport name.
+
+        Raises:
+            ValueError: If the HTTP transport is not supported.
+        """
+        if v not in ("default", "httpx"):
+            raise ValueError("transport must be 'default' or 'httpx'")
+        return v
+
+    @field_validator("access_stats_sample_rate")
+    @classmethod
+    def validate_access_stats_sample_rate(cls, v: float) -> float:
+        """Validate the sample rate of the configuration reads.
+
+        Args:
+            v: The sample rate to validate.
+
+        Returns:
+            The validated sample rate.
+
+        Raises:
+            ValueError: If the sample rate is not between 0 and 1.
+        """
+        if not 0 <= v <= 1:
+            raise ValueError("access_stats_sample_rate must be between 0 and 1")
+        return v
+
+    @field_validator("namespace_memory_budget")
+    @classmethod
+    def validate_namespace_memory_budget(cls, v: Optional[int]) -> Optional[int]:
+        """Validate the memory budget of the lazily loaded namespaces.
+
+        Args:
+            v: The memory budget in bytes to validate, None means no bound.
+
+        Returns:
+            The validated memory budget.
+
+        Raises:
+            ValueError: If the memory budget is not positive.
+        """
+        if v is not None and v <= 0:
+            raise ValueError("namespace_memory_budget must be positive")
+        return v
+
     @model_validator(mode="after")
     def validate_namespaces(self) -> "ApolloSettingsConfig":
         """Convert namespaces to list format.
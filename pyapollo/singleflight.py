@@ -0,0 +1,69 @@
+"""
+Coalescing of concurrent calls by key.
+
+The polling loop, a manual fetch_configuration() and the failover path can
+fetch the same namespace at the same time. With single-flight only the first
+caller runs the fetch, the concurrent callers of the same key wait for it and
+share its result or exception instead of sending their own request and
+writing the cache file again.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Single-flight of the calls of the sync client, shared between threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call fn unless a call with the key is in flight, then wait for its result
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Single-flight of the coroutines of the async client, in one event loop"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """
+        Await fn unless a call with the key is in flight, then wait for its result
+
+        The call runs in its own task, so it is not cancelled with the caller
+        that started it while other callers wait for it.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,168 @@
+"""
+Offline snapshots of the namespaces of an app.
+
+A snapshot is a cache directory baked ahead of time, e.g. into a container
+image with `pyapollo bake`: the cache files of the namespaces and the manifest
+of the app, sealed with the cluster, env and bake time and the SHA-256
+checksum of every cache file. A client given the snapshot directory serves the
+snapshot right away, without any request, and refreshes it from apollo server
+in the background.
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict
+
+SNAPSHOT_VERSION = 1
+
+# Locks of the manifests written by the clients of the process, by path
+_manifest_locks: Dict[str, threading.Lock] = {}
+_manifest_locks_lock = threading.Lock()
+
+
+def get_manifest_file_name(app_id: str) -> str:
+    """
+    Get the file name of the manifest of the app
+    """
+    return f"{app_id}_manifest.json"
+
+
+def get_checksum(content: bytes) -> str:
+    """
+    Get the checksum of the content of a cache file
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_manifest_lock(manifest_path: str) -> threading.Lock:
+    """
+    Get the lock of the manifest, shared by every client of the process
+    """
+    with _manifest_locks_lock:
+        return _manifest_locks.setdefault(
+            os.path.abspath(manifest_path), threading.Lock()
+        )
+
+
+def replace_file(file_path: str, content: bytes) -> None:
+    """
+    Replace the file atomically through a temp file of its own, so readers never
+    see a partial file and concurrent writers never share a temp file
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(file_path) or ".",
+        prefix=f"{os.path.basename(file_path)}.",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_manifest_entries(manifest_path: str, codec: Any) -> Dict[str, Dict]:
+    """
+    Read the cache file entries by namespace from the manifest, empty when the
+    manifest is missing or invalid
+    """
+    try:
+        with open(manifest_path, "rb") as f:
+            return codec.loads(f.read()).get("namespaces", {})
+    except (FileNotFoundError, ValueError, AttributeError):
+        return {}
+
+
+def write_manifest_entry(
+    manifest_path: str, app_id: str, namespace: str, entry: Dict, codec: Any
+) -> None:
+    """
+    Record the cache file entry of the namespace in the manifest of the app
+
+    The read-merge-write holds the lock of the manifest, so the entries written
+    by the clients of the process concurrently are all kept.
+    """
+    with get_manifest_lock(manifest_path):
+        namespaces = read_manifest_entries(manifest_path, codec)
+        namespaces[namespace] = entry
+        replace_file(
+            manifest_path, codec.dumps({"app_id": app_id, "namespaces": namespaces})
+        )
+
+
+def seal_snapshot(
+    snapshot_dir_path: str, app_id: str, cluster: str, env: str, codec: Any
+) -> Dict:
+    """
+    Add the cluster, env, bake time and the checksums of the cache files to the
+    manifest written by a client in the snapshot directory
+
+    Raises:
+        OSError: If the manifest or a cache file cannot be read
+        ValueError: If the manifest is not valid JSON
+    """
+    manifest_path = os.path.join(snapshot_dir_path, get_manifest_file_name(app_id))
+    with open(manifest_path, "rb") as f:
+        manifest = codec.loads(f.read())
+    for entry in manifest.get("namespaces", {}).values():
+        file_path = os.path.join(snapshot_dir_path, os.path.basename(entry["file"]))
+        with open(file_path, "rb") as f:
+            entry["sha256"] = get_checksum(f.read())
+    manifest.update(
+        version=SNAPSHOT_VERSION, cluster=cluster, env=env, baked_at=time.time()
+    )
+    replace_file(manifest_path, codec.dumps(manifest))
+    return manifest
+
+
+def get_snapshot_entries(
+    manifest: Dict, app_id: str, cluster: str, env: str
+) -> Dict[str, Dict]:
+    """
+    Get the cache file entries by namespace of a sealed snapshot manifest
+
+    Raises:
+        ValueError: If the snapshot is not sealed or was baked for another app,
+            cluster or env
+    """
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("snapshot is not sealed by pyapollo bake")
+    baked_for = (manifest.get("app_id"), manifest.get("cluster"), manifest.get("env"))
+    if baked_for != (app_id, cluster, env):
+        raise ValueError(
+            f"snapshot is baked for app {baked_for[0]}, cluster {baked_for[1]}, "
+            f"env {baked_for[2]}"
+        )
+    return manifest.get("namespaces", {})
+
+
+def verify_snapshot_file(entry: Dict, content: bytes) -> None:
+    """
+    Check the content of a cache file against the checksum of its entry
+
+    Raises:
+        ValueError: If the checksum does not match
+    """
+    if entry.get("sha256") != get_checksum(content):
+        raise ValueError(f"checksum of {entry.get('file')} does not match")
+
+
+def _after_fork_in_child() -> None:
+    """
+    Drop the manifest locks, a thread of the parent may hold them at fork
+    """
+    global _manifest_locks_lock
+    _manifest_locks_lock = threading.Lock()
+    _manifest_locks.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,203 @@
+"""
+Scale and soak test harness of the clients.
+
+The harness starts many ApolloClient and AsyncApolloClient instances, one app
+id each, against a FakeApolloServer in the same process and keeps them running
+while it publishes releases at a steady pace. It samples the process at every
+interval: threads, open file descriptors, RSS, the request rate seen by the
+server and the worst refresh latency, the time between a release and the
+moment its client serves it. A count that keeps growing over a long run points
+at a leak of threads, connections, sessions or registered clients.
+
+    pyapollo soak --sync-clients 500 --async-clients 500 --duration 3600
+
+The samples include the threads and sockets of the stand-in server. File
+descriptors and RSS are read from /proc and are None on other systems.
+"""
+
+import os
+import time
+import random
+import shutil
+import asyncio
+import tempfile
+import threading
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from pyapollo.async_client import AsyncApolloClient
+from pyapollo.client import ApolloClient
+from pyapollo.testing import FakeApolloServer
+
+CHECK_INTERVAL = 0.05
+MARKER_KEY = "soak.marker"
+
+
+class SoakSample(NamedTuple):
+    """Sample of the process during a soak run"""
+
+    elapsed: float
+    clients: int
+    threads: int
+    file_descriptors: Optional[int]
+    rss: Optional[int]
+    request_rate: float
+    refresh_latency: Optional[float]
+
+
+def get_file_descriptor_count() -> Optional[int]:
+    """
+    Get the number of open file descriptors of the process
+    """
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def get_rss() -> Optional[int]:
+    """
+    Get the resident set size of the process in bytes
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _get_namespaces(namespace_count: int) -> List[str]:
+    return ["application"] + [f"namespace{i}" for i in range(1, namespace_count)]
+
+
+def _get_configurations(namespace: str, key_count: int) -> dict:
+    return {f"{namespace}.key{i}": f"value{i}" for i in range(key_count)}
+
+
+def run_soak(
+    sync_clients: int = 10,
+    async_clients: int = 10,
+    namespaces: int = 3,
+    keys: int = 20,
+    duration: float = 60.0,
+    sample_interval: float = 10.0,
+    publish_interval: float = 1.0,
+    cycle_time: int = 5,
+    fetch_strategy: str = "configs",
+    on_sample: Optional[Callable[[SoakSample], Any]] = None,
+) -> List[SoakSample]:
+    """
+    Run the clients against a local stand-in server and sample the process
+
+    Args:
+        sync_clients: Number of ApolloClient instances
+        async_clients: Number of AsyncApolloClient instances
+        namespaces: Number of namespaces of every client
+        keys: Number of keys of every namespace
+        duration: Seconds the clients are kept running
+        sample_interval: Seconds between two samples
+        publish_interval: Seconds between two releases, of a random client
+        cycle_time: Polling cycle time of the clients
+        fetch_strategy: Fetch strategy of the clients, 'configfiles' also
+            exercises the notification long polling
+        on_sample: Callable called with every sample as it is taken
+
+    Returns:
+        The samples of the run
+    """
+    namespace_names = _get_namespaces(namespaces)
+    cache_file_dir_path = tempfile.mkdtemp(prefix="pyapollo-soak-")
+    server = FakeApolloServer(notification_hold=cycle_time).start()
+    apps = [f"soak-sync-{i}" for i in range(sync_clients)] + [
+        f"soak-async-{i}" for i in range(async_clients)
+    ]
+    for app_id in apps:
+        for namespace in namespace_names:
+            server.publish(app_id, namespace, _get_configurations(namespace, keys))
+
+    client_options = dict(
+        meta_server_address=server.url,
+        namespaces=namespace_names,
+        cycle_time=cycle_time,
+        fetch_strategy=fetch_strategy,
+        cache_file_dir_path=cache_file_dir_path,
+    )
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.daemon = True
+    loop_thread.start()
+
+    def run_async(coroutine: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    clients: List[Tuple[str, Any]] = []
+    samples: List[SoakSample] = []
+    try:
+        for app_id in apps[:sync_clients]:
+            clients.append((app_id, ApolloClient(app_id=app_id, **client_options)))
+        for app_id in apps[sync_clients:]:
+            client = run_async(
+                AsyncApolloClient.create(app_id=app_id, **client_options)
+            )
+            clients.append((app_id, client))
+
+        def get_marker(client: Any) -> Any:
+            if isinstance(client, AsyncApolloClient):
+                return run_async(client.get_value(MARKER_KEY))
+            return client.get_value(MARKER_KEY)
+
+        started_at = time.monotonic()
+        next_publish = started_at
+        next_sample = started_at + sample_interval
+        request_count = server.get_request_count()
+        pending: List[Tuple[Any, str, float]] = []
+        latencies: List[float] = []
+        release = 0
+        while True:
+            now = time.monotonic()
+            if now - started_at >= duration:
+                break
+            if clients and now >= next_publish:
+                release += 1
+                app_id, client = random.choice(clients)
+                configurations = _get_configurations("application", keys)
+                configurations[MARKER_KEY] = str(release)
+                server.publish(app_id, "application", configurations)
+                pending.append((client, str(release), now))
+                next_publish = now + publish_interval
+            for entry in list(pending):
+                client, marker, published_at = entry
+                if get_marker(client) == marker:
+                    latencies.append(time.monotonic() - published_at)
+                    pending.remove(entry)
+            if now >= next_sample:
+                count = server.get_request_count()
+                # A release not served yet counts with its current age
+                waiting = [now - published_at for _, _, published_at in pending]
+                sample = SoakSample(
+                    elapsed=now - started_at,
+                    clients=len(clients),
+                    threads=threading.active_count(),
+                    file_descriptors=get_file_descriptor_count(),
+                    rss=get_rss(),
+                    request_rate=(count - request_count) / sample_interval,
+                    refresh_latency=max(latencies + waiting, default=None),
+                )
+                samples.append(sample)
+                if on_sample is not None:
+                    on_sample(sample)
+                request_count = count
+                latencies = []
+                next_sample += sample_interval
+            time.sleep(CHECK_INTERVAL)
+    finally:
+        for _, client in clients:
+            if isinstance(client, AsyncApolloClient):
+                run_async(client.close())
+            else:
+                client.close()
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+        server.stop()
+        shutil.rmtree(cache_file_dir_path, ignore_errors=True)
+    return samples
@@ -0,0 +1,203 @@
+"""
+Sampled statistics of the configuration reads.
+
+With a sample rate above 0 the clients count a random sample of the keys read
+by get_value, get_values and get_json_value, so the report can estimate which
+keys are hot, which namespaces are read how often and which keys were never
+read at all, e.g. to shrink namespaces that cost refresh bandwidth but are not
+used. With sampling disabled a read costs a single comparison, a read that is
+not sampled a single random number.
+
+The counts are estimates: a key read less often than about once every
+1 / sample_rate reads may be reported as unread.
+
+The namespace accounting reports what every namespace costs: its key count,
+the approximate deep memory size of its snapshot, and the size and decode time
+of the payload of its last release. The memory size is computed once per
+snapshot, so scraping the stats periodically stays cheap.
+"""
+
+import sys
+import time
+import random
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+
+class AccessReport(NamedTuple):
+    """Report of the sampled configuration reads"""
+
+    sample_rate: float
+    duration: float
+    top_keys: List[Tuple[str, str, float]]
+    unread_keys: Dict[str, List[str]]
+    namespace_read_rates: Dict[str, float]
+
+
+class AccessStats:
+    """Counters of a random sample of the configuration reads"""
+
+    def __init__(self, sample_rate: float = 0.0):
+        """
+        Initialize method
+
+        Args:
+            sample_rate: Fraction of the reads counted, 0 disables the counters
+        """
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._started_at = time.monotonic()
+
+    def record(self, namespace: str, key: str) -> None:
+        """
+        Count the read of the key if it is sampled
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            self._counts[(namespace, key)] += 1
+
+    def record_many(self, namespace: str, keys: Iterable[str]) -> None:
+        """
+        Count the reads of the keys that are sampled
+        """
+        if self.sample_rate <= 0:
+            return
+        for key in keys:
+            self.record(namespace, key)
+
+    def report(self, snapshots: Mapping[str, Mapping], top: int = 20) -> AccessReport:
+        """
+        Report the estimated reads of the keys of the namespace snapshots
+
+        Args:
+            snapshots: The current configurations by namespace
+            top: Number of the most read keys reported
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        duration = max(time.monotonic() - self._started_at, 1e-9)
+        scale = 1 / self.sample_rate if self.sample_rate > 0 else 0.0
+
+        top_keys = [
+            (namespace, key, count * scale)
+            for (namespace, key), count in sorted(
+                counts.items(), key=lambda item: item[1], reverse=True
+            )[:top]
+        ]
+        namespace_reads: Dict[str, int] = {namespace: 0 for namespace in snapshots}
+        for (namespace, _), count in counts.items():
+            namespace_reads[namespace] = namespace_reads.get(namespace, 0) + count
+        unread_keys = {
+            namespace: sorted(
+                key for key in snapshot or () if (namespace, key) not in counts
+            )
+            for namespace, snapshot in snapshots.items()
+        }
+        return AccessReport(
+            sample_rate=self.sample_rate,
+            duration=duration,
+            top_keys=top_keys,
+            unread_keys=unread_keys,
+            namespace_read_rates={
+                namespace: reads * scale / duration
+                for namespace, reads in namespace_reads.items()
+            },
+        )
+
+    def reset(self) -> None:
+        """
+        Forget every counted read and restart the report period
+        """
+        with self._lock:
+            self._counts.clear()
+            self._started_at = time.monotonic()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Recreate the lock, a thread of the parent may have held it
+        """
+        self._lock = threading.Lock()
+
+
+class NamespaceStats(NamedTuple):
+    """Cost of a namespace, the payload fields are None before its first fetch"""
+
+    key_count: int
+    memory_size: int
+    payload_size: Optional[int]
+    decode_time: Optional[float]
+    release_key: Optional[str]
+
+
+def get_deep_size(obj: Any) -> int:
+    """
+    Estimate the memory size of the object and every object it references, in
+    bytes, counting shared objects once
+    """
+    seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        else:
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    pending.append(getattr(current, slot))
+            if hasattr(current, "__dict__"):
+                pending.append(vars(current))
+    return size
+
+
+class NamespaceAccounting:
+    """Payload sizes, decode times and memory sizes of the namespaces"""
+
+    def __init__(self):
+        self._payloads: Dict[str, Tuple[int, float]] = {}
+        self._memory_sizes: Dict[str, Tuple[Any, int]] = {}
+
+    def record_payload(self, namespace: str, size: int, decode_time: float) -> None:
+        """
+        Record the size and decode time of the payload of a new release
+        """
+        self._payloads[namespace] = (size, decode_time)
+
+    def get_stats(
+        self,
+        namespace: str,
+        snapshot: Optional[Mapping],
+        release_key: Optional[str],
+    ) -> NamespaceStats:
+        """
+        Get the stats of the namespace snapshot, its memory size is only
+        computed again when the snapshot changed
+        """
+        memory_size = 0
+        if snapshot is not None:
+            cached = self._memory_sizes.get(namespace)
+            if cached is not None and cached[0] is snapshot:
+                memory_size = cached[1]
+            else:
+                memory_size = get_deep_size(snapshot)
+                self._memory_sizes[namespace] = (snapshot, memory_size)
+        payload_size, decode_time = self._payloads.get(namespace, (None, None))
+        return NamespaceStats(
+            key_count=len(snapshot) if snapshot is not None else 0,
+            memory_size=memory_size,
+            payload_size=payload_size,
+            decode_time=decode_time,
+            release_key=release_key,
+        )
@@ -0,0 +1,290 @@
+"""
+Local stand-in for apollo server.
+
+FakeApolloServer serves the HTTP API used by the clients from memory: the
+config service lookup, /configs with release keys, 304 answers and optionally
+the changes since the release key of the client, the cached /configfiles/json
+endpoint and /notifications/v2 long polling. Releases are published from the
+test or harness, which can then check how fast clients see them. Every request
+is counted by endpoint. Setting outage_status, e.g. to 503, answers every
+request with that status until it is reset to None.
+
+    with FakeApolloServer() as server:
+        server.publish("my-app", "application", {"key": "value"})
+        client = ApolloClient(meta_server_address=server.url, app_id="my-app")
+"""
+
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_NOTIFICATION_HOLD = 30.0
+
+
+class _Release:
+    """Release of a namespace"""
+
+    def __init__(self, release_key: str, configurations: Dict[str, str]):
+        self.release_key = release_key
+        self.configurations = configurations
+
+
+class FakeApolloServer:
+    """In-memory apollo meta and config server on a local port"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        notification_hold: float = DEFAULT_NOTIFICATION_HOLD,
+        incremental_sync: bool = False,
+    ):
+        """
+        Initialize method
+
+        Args:
+            host: Host to listen on
+            port: Port to listen on, 0 picks a free port
+            notification_hold: Seconds a notification request is held while
+                nothing is published, like the 60 seconds of apollo server
+            incremental_sync: Answer a /configs request with a previous release
+                key with the changes since that release, like apollo server with
+                incremental sync enabled
+        """
+        self.notification_hold = notification_hold
+        self.incremental_sync = incremental_sync
+        self.outage_status: Optional[int] = None
+        self.requests: Counter = Counter()
+        self._lock = threading.Condition()
+        self._releases: Dict[Tuple[str, str, str], _Release] = {}
+        self._published: Dict[str, Dict[str, str]] = {}
+        self._notification_ids: Dict[Tuple[str, str, str], int] = {}
+        self._release_count = 0
+        self._stopped = False
+        self._server = ThreadingHTTPServer((host, port), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The meta server address of the server
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeApolloServer":
+        """
+        Serve the requests in a background thread
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the listening socket
+        """
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeApolloServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def publish(
+        self,
+        app_id: str,
+        namespace: str,
+        configurations: Dict[str, str],
+        cluster: str = "default",
+    ) -> str:
+        """
+        Publish a release of the namespace and notify the clients polling it
+
+        Returns:
+            The release key of the new release
+        """
+        key = (app_id, cluster, namespace)
+        with self._lock:
+            self._release_count += 1
+            release_key = f"{app_id}-{namespace}-{self._release_count}"
+            self._releases[key] = _Release(release_key, dict(configurations))
+            self._published[release_key] = dict(configurations)
+            self._notification_ids[key] = self._release_count
+            self._lock.notify_all()
+        return release_key
+
+    def get_request_count(self) -> int:
+        """
+        Get the number of requests served
+        """
+        with self._lock:
+            return sum(self.requests.values())
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    def _get_release(
+        self, app_id: str, cluster: str, namespace: str
+    ) -> Optional[_Release]:
+        with self._lock:
+            return self._releases.get((app_id, cluster, namespace))
+
+    def _get_changes(self, release_key: str, release: _Release) -> Optional[list]:
+        """
+        Get the configuration changes from a previous release to the release,
+        None when the previous release is unknown
+        """
+        with self._lock:
+            previous = self._published.get(release_key)
+        if previous is None:
+            return None
+        current = release.configurations
+        changes = [
+            {
+                "key": key,
+                "newValue": value,
+                "configurationChangeType": (
+                    "ADDED" if key not in previous else "MODIFIED"
+                ),
+            }
+            for key, value in current.items()
+            if previous.get(key) != value
+        ]
+        changes.extend(
+            {"key": key, "configurationChangeType": "DELETED"}
+            for key in previous
+            if key not in current
+        )
+        return changes
+
+    def _wait_notifications(
+        self, app_id: str, cluster: str, notifications: list
+    ) -> list:
+        """
+        Hold the request until a polled namespace has a newer notification id
+        """
+        with self._lock:
+            self._lock.wait_for(
+                lambda: self._stopped
+                or self._get_changed(app_id, cluster, notifications),
+                timeout=self.notification_hold,
+            )
+            return self._get_changed(app_id, cluster, notifications)
+
+    def _get_changed(self, app_id: str, cluster: str, notifications: list) -> list:
+        changed = []
+        for notification in notifications:
+            namespace = notification.get("namespaceName")
+            notification_id = self._notification_ids.get((app_id, cluster, namespace))
+            if notification_id is not None and notification_id != notification.get(
+                "notificationId"
+            ):
+                changed.append(
+                    {"namespaceName": namespace, "notificationId": notification_id}
+                )
+        return changed
+
+    def _create_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: Any = None) -> None:
+                content = b"" if body is None else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                if server.outage_status is not None:
+                    server._count("outage")
+                    return self._send(
+                        server.outage_status, {"status": server.outage_status}
+                    )
+                if url.path == "/services/config":
+                    server._count("services")
+                    return self._send(
+                        200,
+                        [
+                            {
+                                "appName": "APOLLO-CONFIGSERVICE",
+                                "homepageUrl": f"{server.url}/",
+                            }
+                        ],
+                    )
+                if len(parts) == 4 and parts[0] == "configs":
+                    server._count("configs")
+                    release = server._get_release(*parts[1:])
+                    if release is None:
+                        return self._send(404, {"status": 404})
+                    release_key = query.get("releaseKey", [None])[0]
+                    if release_key == release.release_key:
+                        return self._send(304)
+                    changes = None
+                    if server.incremental_sync and release_key:
+                        changes = server._get_changes(release_key, release)
+                    if changes is not None:
+                        server._count("incremental")
+                        return self._send(
+                            200,
+                            {
+                                "appId": parts[1],
+                                "cluster": parts[2],
+                                "namespaceName": parts[3],
+                                "configurationChanges": changes,
+                                "releaseKey": release.release_key,
+                                "configSyncType": "IncrementalSync",
+                            },
+                        )
+                    return self._send(
+                        200,
+                        {
+                            "appId": parts[1],
+                            "cluster": parts[2],
+                            "namespaceName": parts[3],
+                            "configurations": release.configurations,
+                            "releaseKey": release.release_key,
+                        },
+                    )
+                if len(parts) == 5 and parts[:2] == ["configfiles", "json"]:
+                    server._count("configfiles")
+                    release = server._get_release(*parts[2:])
+                    if release is None:
+                        return self._send(404, {"status": 404})
+                    return self._send(200, release.configurations)
+                if url.path == "/notifications/v2":
+                    server._count("notifications")
+                    notifications = json.loads(query.get("notifications", ["[]"])[0])
+                    changed = server._wait_notifications(
+                        query.get("appId", [""])[0],
+                        query.get("cluster", ["default"])[0],
+                        notifications,
+                    )
+                    if changed:
+                        return self._send(200, changed)
+                    return self._send(304)
+                server._count("unknown")
+                self._send(404, {"status": 404})
+
+        return Handler
@@ -0,0 +1,491 @@
+"""
+HTTP transports used by the clients.
+
+Every request of a client goes through its transport: the config service
+lookup on the meta server, the namespace fetches and the notification polls.
+The default transports use requests and aiohttp. The httpx transports are used
+when httpx is installed and selected, they negotiate HTTP/2 when the h2 package
+is installed too, so the requests to a config node are multiplexed over a
+single connection.
+
+The sync transports are shared by all the sync clients of the process, so the
+clients of several app ids reuse the same connections. The async transports
+are bound to an event loop and owned by their client, unless a transport
+instance is passed to the client. The aiohttp sessions of the clients running
+in the same event loop share one connection pool.
+
+The requests and aiohttp transports resolve hosts through the shared DNS
+cache of pyapollo.resolver, the httpx transports use the resolution of httpx.
+
+The connections of a transport cannot be used by both processes after a fork,
+so the transports drop the connections inherited by a forked child. They are
+kept referenced instead of closed, because closing them could end the TLS
+sessions of the parent process.
+"""
+
+import os
+import socket
+import asyncio
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+from pyapollo.exceptions import ServerNotResponseException
+from pyapollo.resolver import CachingResolver, dns_cache
+
+TRANSPORTS = ("default", "httpx")
+
+_live_transports = weakref.WeakSet()
+_inherited_connections: List[Any] = []  # Never closed in the forked child
+_shared_transports: Dict[str, "Transport"] = {}
+_shared_transports_lock = threading.Lock()
+
+# Pool of the aiohttp transports: connections are kept alive longer than the
+# default cycle time, so every poll reuses the connection of the previous one
+CONNECTOR_LIMIT = 100
+CONNECTOR_LIMIT_PER_HOST = 10
+CONNECTOR_KEEPALIVE_TIMEOUT = 60
+_shared_connectors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, List]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class TransportResponse(NamedTuple):
+    """Response of a transport request, with the decompressed body"""
+
+    status_code: int
+    content: bytes
+
+    @property
+    def text(self) -> str:
+        """
+        Get the body as text
+        """
+        return self.content.decode("utf-8", errors="replace")
+
+
+class Transport(ABC):
+    """HTTP transport of the sync client"""
+
+    name = ""
+
+    def __init__(self):
+        _live_transports.add(self)
+
+    @abstractmethod
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        """
+        Send a GET request
+
+        Raises:
+            ServerNotResponseException: If the request timed out or failed to connect
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Close the connections of the transport
+        """
+
+    @abstractmethod
+    def _reset_after_fork(self) -> None:
+        """
+        Drop the connections inherited from the parent process
+        """
+
+
+class _CachedDNSConnectionMixin:
+    """urllib3 connection resolving its host through the shared DNS cache"""
+
+    def _new_conn(self) -> socket.socket:
+        try:
+            return dns_cache.create_connection(
+                (self._dns_host, self.port),
+                self.timeout,
+                source_address=self.source_address,
+                socket_options=self.socket_options,
+            )
+        except socket.gaierror as e:
+            raise NewConnectionError(self, f"Failed to resolve {self.host}: {e}") from e
+        except socket.timeout as e:
+            raise ConnectTimeoutError(
+                self,
+                f"Connection to {self.host} timed out. (connect timeout={self.timeout})",
+            ) from e
+        except OSError as e:
+            raise NewConnectionError(
+                self, f"Failed to establish a new connection: {e}"
+            ) from e
+
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+
+class _CachedDNSAdapter(HTTPAdapter):
+    """requests adapter whose connections use the shared DNS cache"""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDNSHTTPConnectionPool,
+            "https": _CachedDNSHTTPSConnectionPool,
+        }
+
+
+def _create_requests_session() -> requests.Session:
+    session = requests.Session()
+    adapter = _CachedDNSAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RequestsTransport(Transport):
+    """Transport based on a requests session"""
+
+    name = "requests"
+
+    def __init__(self):
+        super().__init__()
+        self._session = _create_requests_session()
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        try:
+            response = self._session.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        except requests.exceptions.Timeout:
+            raise ServerNotResponseException(f"Request to {url} timed out.")
+        except requests.exceptions.ConnectionError:
+            raise ServerNotResponseException(f"Failed to connect to {url}.")
+        return TransportResponse(response.status_code, response.content)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _reset_after_fork(self) -> None:
+        _inherited_connections.append(self._session)
+        self._session = _create_requests_session()
+
+
+class HttpxTransport(Transport):
+    """Transport based on httpx, using HTTP/2 when h2 is installed"""
+
+    name = "httpx"
+
+    def __init__(self, http2: Optional[bool] = None):
+        """
+        Initialize method
+
+        Args:
+            http2: Flag to use HTTP/2, default value is None to use it when the
+                h2 package is installed
+
+        Raises:
+            ValueError: If httpx is not installed
+        """
+        if httpx is None:
+            raise ValueError("Transport httpx requires the httpx package")
+        super().__init__()
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._client = httpx.Client(http2=self.http2)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        try:
+            response = self._client.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        except httpx.TimeoutException:
+            raise ServerNotResponseException(f"Request to {url} timed out.")
+        except httpx.TransportError:
+            raise ServerNotResponseException(f"Failed to connect to {url}.")
+        return TransportResponse(response.status_code, response.content)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _reset_after_fork(self) -> None:
+        _inherited_connections.append(self._client)
+        self._client = httpx.Client(http2=self.http2)
+
+
+class AsyncTransport(ABC):
+    """HTTP transport of the async client"""
+
+    name = ""
+
+    def __init__(self):
+        _live_transports.add(self)
+
+    @abstractmethod
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        """
+        Send a GET request
+
+        Raises:
+            ServerNotResponseException: If the request timed out or failed to connect
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Close the connections of the transport, it reconnects on the next request
+        """
+
+    @abstractmethod
+    def _reset_after_fork(self) -> None:
+        """
+        Drop the connections inherited from the parent process
+        """
+
+
+def _acquire_shared_connector() -> aiohttp.TCPConnector:
+    """
+    Get the connector shared by the aiohttp transports of the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    entry = _shared_connectors.get(loop)
+    if entry is None or entry[0].closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+            keepalive_timeout=CONNECTOR_KEEPALIVE_TIMEOUT,
+            resolver=CachingResolver(),
+            use_dns_cache=False,
+        )
+        entry = _shared_connectors[loop] = [connector, 0]
+    entry[1] += 1
+    return entry[0]
+
+
+async def _release_shared_connector(connector: aiohttp.TCPConnector) -> None:
+    """
+    Close the shared connector once the last transport using it is closed
+    """
+    loop = asyncio.get_running_loop()
+    entry = _shared_connectors.get(loop)
+    if entry is None or entry[0] is not connector:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del _shared_connectors[loop]
+        await connector.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    """Transport based on an aiohttp session"""
+
+    name = "aiohttp"
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        """
+        Initialize method
+
+        Args:
+            session: aiohttp client session, if not provided, a new one using
+                the connector shared in the event loop will be created and owned
+                by the transport
+        """
+        super().__init__()
+        self._session = session
+        self._owns_session = session is None
+        self._connector = None
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        if self._session is None:
+            self._connector = _acquire_shared_connector()
+            self._session = aiohttp.ClientSession(
+                connector=self._connector, connector_owner=False
+            )
+            self._owns_session = True
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        try:
+            async with self._session.get(
+                url, params=params, headers=headers, **kwargs
+            ) as response:
+                return TransportResponse(response.status, await response.read())
+        except asyncio.TimeoutError:
+            raise ServerNotResponseException(f"Request to {url} timed out.")
+        except aiohttp.ClientConnectionError:
+            raise ServerNotResponseException(f"Failed to connect to {url}.")
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            connector, self._connector = self._connector, None
+            await _release_shared_connector(connector)
+
+    def _reset_after_fork(self) -> None:
+        if self._owns_session and self._session is not None:
+            _inherited_connections.append(self._session)
+            self._session = None
+            self._connector = None
+
+
+class AsyncHttpxTransport(AsyncTransport):
+    """Async transport based on httpx, using HTTP/2 when h2 is installed"""
+
+    name = "httpx"
+
+    def __init__(self, http2: Optional[bool] = None):
+        """
+        Initialize method
+
+        Args:
+            http2: Flag to use HTTP/2, default value is None to use it when the
+                h2 package is installed
+
+        Raises:
+            ValueError: If httpx is not installed
+        """
+        if httpx is None:
+            raise ValueError("Transport httpx requires the httpx package")
+        super().__init__()
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._client = None
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        if self._client is None:
+            self._client = httpx.AsyncClient(http2=self.http2)
+        try:
+            response = await self._client.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        except httpx.TimeoutException:
+            raise ServerNotResponseException(f"Request to {url} timed out.")
+        except httpx.TransportError:
+            raise ServerNotResponseException(f"Failed to connect to {url}.")
+        return TransportResponse(response.status_code, response.content)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _reset_after_fork(self) -> None:
+        if self._client is not None:
+            _inherited_connections.append(self._client)
+            self._client = None
+
+
+def _check_transport_name(name: str) -> None:
+    if name not in TRANSPORTS:
+        raise ValueError(f"Transport {name} is unknown")
+    if name == "httpx" and httpx is None:
+        raise ValueError("Transport httpx requires the httpx package")
+
+
+def get_transport(name: str = "default") -> Transport:
+    """
+    Get the sync transport shared by the clients of the process
+
+    Raises:
+        ValueError: If the transport is unknown or its package is not installed
+    """
+    _check_transport_name(name)
+    with _shared_transports_lock:
+        transport = _shared_transports.get(name)
+        if transport is None:
+            transport = HttpxTransport() if name == "httpx" else RequestsTransport()
+            _shared_transports[name] = transport
+        return transport
+
+
+def create_async_transport(
+    name: str = "default", session: Optional[aiohttp.ClientSession] = None
+) -> AsyncTransport:
+    """
+    Create an async transport, the aiohttp session is only used by the default one
+
+    Raises:
+        ValueError: If the transport is unknown or its package is not installed
+    """
+    _check_transport_name(name)
+    if name == "httpx":
+        return AsyncHttpxTransport()
+    return AiohttpTransport(session)
+
+
+def _after_fork_in_child() -> None:
+    global _shared_transports_lock
+    _shared_transports_lock = threading.Lock()
+    _inherited_connections.extend(entry[0] for entry in _shared_connectors.values())
+    _shared_connectors.clear()
+    for transport in list(_live_transports):
+        transport._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
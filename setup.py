@@ -18,6 +18,15 @@ setup(
         "aiofiles",
         "pydantic-settings",
     ],
+    extras_require={
+        "zstd": ["zstandard"],
+        "orjson": ["orjson"],
+        "msgspec": ["msgspec"],
+        "http2": ["httpx[http2]"],
+    },
+    entry_points={
+        "console_scripts": ["pyapollo=pyapollo.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,353 @@
+"""
+Test script for the async apollo client against a local stand-in server.
+"""
+
+import asyncio
+import os
+
+import pytest
+from pydantic import BaseModel
+
+from pyapollo.async_client import FETCH_CONCURRENCY, AsyncApolloClient
+from pyapollo.exceptions import ServerNotResponseException, StaleConfigException
+from pyapollo.snapshot import seal_snapshot
+from pyapollo.testing import FakeApolloServer
+from pyapollo.transport import AsyncTransport, create_async_transport
+
+
+class AsyncSwitchTransport(AsyncTransport):
+    """Async transport failing every request while fail is set"""
+
+    name = "switch"
+
+    def __init__(self):
+        super().__init__()
+        self.fail = False
+        self.urls = []
+        self._transport = create_async_transport()
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        self.urls.append(url)
+        if self.fail:
+            raise ServerNotResponseException(f"Request to {url} failed.")
+        return await self._transport.get(
+            url, params=params, headers=headers, timeout=timeout
+        )
+
+    async def close(self):
+        await self._transport.close()
+
+    def _reset_after_fork(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    with FakeApolloServer(notification_hold=0.5) as server:
+        yield server
+
+
+def create_client(server, tmp_path, **kwargs):
+    return AsyncApolloClient.create(
+        meta_server_address=server.url,
+        app_id="app",
+        cache_file_dir_path=str(tmp_path),
+        **kwargs,
+    )
+
+
+# pytest -vs tests/test_async_client.py::test_refresh_failure_keeps_memory
+def test_refresh_failure_keeps_memory(server, tmp_path):
+    """A failed refresh keeps the in-memory snapshot and reports its age"""
+    server.publish("app", "application", {"a": "1"})
+
+    async def main():
+        transport = AsyncSwitchTransport()
+        client = await create_client(server, tmp_path, transport=transport)
+        try:
+            # An older release on disk must not replace the snapshot in memory
+            file_path = os.path.join(
+                client._cache_file_dir_path,
+                client._get_cache_file_name("application"),
+            )
+            with open(file_path, "wb") as f:
+                f.write(client._encode_cache_file({"a": "old"}))
+            disk_reads = []
+            read_cache_entry = client._read_cache_entry
+
+            async def count_read(*args):
+                disk_reads.append(args)
+                return await read_cache_entry(*args)
+
+            client._read_cache_entry = count_read
+
+            transport.fail = True
+            await client.fetch_configuration()
+            await client.fetch_configuration()
+            assert await client.get_value("a") == "1"
+            assert disk_reads == []
+
+            await asyncio.sleep(0.1)
+            age = client.get_config_age("application")
+            assert age >= 0.1
+            assert list(client.get_stale_namespaces(0.05)) == ["application"]
+            with pytest.raises(StaleConfigException):
+                client.ensure_fresh(0.05)
+
+            transport.fail = False
+            await client.fetch_configuration()
+            assert client.get_config_age("application") < age
+        finally:
+            await client.close()
+            await transport.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_empty_namespace_from_configfiles
+def test_empty_namespace_from_configfiles(server, tmp_path):
+    """An empty namespace read from /configfiles/json counts as refreshed"""
+    server.publish("app", "application", {"a": "1"})
+    server.publish("app", "empty", {})
+
+    async def main():
+        client = await create_client(
+            server,
+            tmp_path,
+            namespaces=["application", "empty"],
+            fetch_strategy="configfiles",
+        )
+        try:
+            assert await client.get_value("a", "none", namespace="empty") == "none"
+            assert client.get_config_age("empty") is not None
+            assert client.get_stale_namespaces(10) == {}
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_bind_lazy_namespace
+def test_bind_lazy_namespace(server, tmp_path):
+    """Binding a lazy namespace loads it first"""
+    server.publish("app", "application", {"a": "1"})
+    server.publish("app", "other", {"b": "2"})
+
+    class Other(BaseModel):
+        b: int
+
+    async def main():
+        client = await create_client(
+            server,
+            tmp_path,
+            namespaces=["application", "other"],
+            lazy_namespaces=True,
+        )
+        try:
+            binding = await client.bind_model(Other, namespace="other")
+            assert binding.model.b == 2
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+
+
+class SlowTransport(AsyncSwitchTransport):
+    """Async transport delaying the namespace fetches and counting the ones in
+    flight"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        if "/configs/" not in url:
+            return await super().get(url, params, headers, timeout)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            return await super().get(url, params, headers, timeout)
+        finally:
+            self.in_flight -= 1
+
+
+# pytest -vs tests/test_async_client.py::test_concurrent_fetch
+def test_concurrent_fetch(server, tmp_path):
+    """The namespaces are fetched concurrently, up to FETCH_CONCURRENCY"""
+    namespaces = [f"namespace{i}" for i in range(12)]
+    for namespace in namespaces:
+        server.publish("app", namespace, {"key": namespace})
+
+    async def main():
+        transport = SlowTransport()
+        client = await create_client(
+            server, tmp_path, namespaces=namespaces, transport=transport
+        )
+        try:
+            assert 1 < transport.max_in_flight <= FETCH_CONCURRENCY
+            for namespace in namespaces:
+                assert await client.get_value("key", namespace=namespace) == namespace
+        finally:
+            await client.close()
+            await transport.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_create_registry
+def test_create_registry(server, tmp_path):
+    """create() returns the started client of the same app until its last
+    user closes it"""
+    server.publish("app", "application", {"a": "1"})
+    server.publish("app", "other", {"b": "2"})
+
+    async def main():
+        client = await create_client(
+            server, tmp_path, namespaces=["application", "other"]
+        )
+        same = await AsyncApolloClient.create(
+            meta_server_address=f"{server.url}/",
+            app_id="app",
+            namespaces=["other", "application"],
+            cache_file_dir_path=str(tmp_path),
+        )
+        assert same is client
+        # Only the first user started the client and fetched the namespaces
+        assert server.requests["configs"] == 2
+        polling_task = client._polling_task
+        assert polling_task is not None
+
+        await client.close()
+        assert client._polling_task is polling_task
+        assert AsyncApolloClient._instances[client._instance_key] is client
+        await same.close()
+        assert client._polling_task is None
+        assert client._instance_key not in AsyncApolloClient._instances
+
+        other = await create_client(
+            server, tmp_path, namespaces=["application", "other"]
+        )
+        try:
+            assert other is not client
+            assert await other.get_value("a") == "1"
+        finally:
+            await other.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_shared_manifest
+def test_shared_manifest(server, tmp_path):
+    """Clients of the same app sharing a cache directory keep every manifest entry"""
+    namespaces = [f"namespace{i}" for i in range(8)]
+    for namespace in namespaces:
+        server.publish("app", namespace, {"key": namespace})
+
+    async def main():
+        clients = await asyncio.gather(
+            *(
+                create_client(server, tmp_path, namespaces=[namespace])
+                for namespace in namespaces
+            )
+        )
+        try:
+            manifest = await clients[0]._read_manifest()
+            assert sorted(manifest) == namespaces
+            # No write error was taken for a config server failure
+            assert server.requests["services"] == len(clients)
+        finally:
+            for client in clients:
+                await client.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_read_after_concurrent_eviction
+def test_read_after_concurrent_eviction(server, tmp_path):
+    """A namespace evicted right after its lazy load is loaded again for the read"""
+    server.publish("app", "application", {"a": "1"})
+
+    async def main():
+        client = await create_client(server, tmp_path, lazy_namespaces=True)
+        try:
+            load_namespace = client.load_namespace
+            evict = [True]
+
+            async def load_and_evict(namespace="application"):
+                await load_namespace(namespace)
+                if evict[0]:
+                    # Evicted by the load of another task before the read
+                    client._cache.pop(namespace, None)
+                    evict[0] = False
+
+            client.load_namespace = load_and_evict
+            assert await client.get_value("a") == "1"
+            evict[0] = True
+            assert await client.get_values(["a"]) == {"a": "1"}
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_snapshot_boot_writes_cache
+def test_snapshot_boot_writes_cache(server, tmp_path):
+    """A client booted from a snapshot writes its cache files and manifest"""
+    release_key = server.publish("app", "application", {"a": "1"})
+    snapshot_dir = tmp_path / "snapshot"
+    cache_dir = tmp_path / "cache"
+
+    async def main():
+        baker = await create_client(server, snapshot_dir)
+        await baker.close()
+        seal_snapshot(str(snapshot_dir), "app", "default", "DEV", baker._codec)
+
+        transport = AsyncSwitchTransport()
+        transport.fail = True
+        client = await create_client(
+            server, cache_dir, snapshot_dir_path=str(snapshot_dir), transport=transport
+        )
+        try:
+            assert await client.get_value("a") == "1"
+            manifest = await client._read_manifest()
+            assert manifest["application"]["release_key"] == release_key
+            data, _ = await client._read_cache_entry(
+                "application", manifest["application"]
+            )
+            assert data == {"a": "1"}
+        finally:
+            await client.close()
+            await transport.close()
+
+    asyncio.run(main())
+
+
+# pytest -vs tests/test_async_client.py::test_key_range_reads_resume_polling
+def test_key_range_reads_resume_polling(server, tmp_path):
+    """bind_model, get_by_prefix and get_by_range resume polling after a fork"""
+    server.publish("app", "application", {"a": "1"})
+
+    class Model(BaseModel):
+        a: str
+
+    async def main():
+        client = await create_client(server, tmp_path)
+        try:
+            reads = [
+                lambda: client.bind_model(Model),
+                lambda: client.get_by_prefix("a"),
+                lambda: client.get_by_range("a", "b"),
+            ]
+            for read in reads:
+                await client.stop_polling()
+                # The state left by _reset_after_fork in a forked child
+                client._resume_polling_after_fork = True
+                await read()
+                await asyncio.sleep(0.1)
+                assert client._polling_task is not None
+        finally:
+            await client.close()
+
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Test script for binding namespaces to pydantic models.
+"""
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from pyapollo.binding import ModelBinding
+from pyapollo.key_index import KeyIndex
+
+
+class DatabaseConfig(BaseModel):
+    host: str
+    port: int
+
+
+def make_binding(cache, prefix=None):
+    return ModelBinding(
+        DatabaseConfig,
+        "application",
+        cache.get,
+        lambda namespace: KeyIndex(cache[namespace]),
+        prefix,
+    )
+
+
+# pytest -vs tests/test_binding.py::test_model_rebuilt_on_new_snapshot
+def test_model_rebuilt_on_new_snapshot():
+    """Test the model is validated once per snapshot."""
+    cache = {"application": {"host": "db-1", "port": "5432"}}
+    binding = make_binding(cache)
+
+    model = binding.model
+    assert model.port == 5432
+    assert binding.model is model
+
+    cache["application"] = {"host": "db-2", "port": "5433"}
+    assert binding.model.host == "db-2"
+
+
+# pytest -vs tests/test_binding.py::test_prefix
+def test_prefix():
+    """Test binding only the keys under a prefix."""
+    cache = {
+        "application": {
+            "db.primary.host": "db-1",
+            "db.primary.port": "5432",
+            "db.replica.host": "db-2",
+        }
+    }
+
+    assert make_binding(cache, prefix="db.primary.").model.host == "db-1"
+
+
+# pytest -vs tests/test_binding.py::test_invalid_release_keeps_last_model
+def test_invalid_release_keeps_last_model():
+    """Test a release failing validation keeps the last valid model."""
+    cache = {"application": {"host": "db-1", "port": "5432"}}
+    binding = make_binding(cache)
+    model = binding.model
+
+    cache["application"] = {"host": "db-1", "port": "not-a-port"}
+    assert binding.model is model
+    assert isinstance(binding.error, ValidationError)
+
+
+# pytest -vs tests/test_binding.py::test_never_valid
+def test_never_valid():
+    """Test reading a binding that never validated raises."""
+    with pytest.raises(LookupError):
+        make_binding({}).model
+    with pytest.raises(ValidationError):
+        make_binding({"application": {"host": "db-1"}}).model
@@ -0,0 +1,47 @@
+"""
+Test script for the memory budget of the lazily loaded namespaces.
+"""
+
+from pyapollo.budget import NamespaceBudget, estimate_size
+
+
+# pytest -vs tests/test_budget.py::test_estimate_size
+def test_estimate_size():
+    """Test the size is estimated from the keys and values."""
+    assert estimate_size(None) == 0
+    assert estimate_size({"key": "value", "n": 10}) == 3 + 5 + 1 + 2
+
+
+# pytest -vs tests/test_budget.py::test_evict_least_recently_used
+def test_evict_least_recently_used():
+    """Test the least recently used namespaces are evicted above the budget."""
+    budget = NamespaceBudget(memory_budget=100)
+    assert budget.add("a", 40) == []
+    assert budget.add("b", 40) == []
+    budget.touch("a")
+    assert budget.add("c", 40) == ["b"]
+    assert budget.namespaces == ["a", "c"]
+    assert budget.total_size == 80
+
+
+# pytest -vs tests/test_budget.py::test_keep_namespaces
+def test_keep_namespaces():
+    """Test kept namespaces and the added one are never evicted."""
+    budget = NamespaceBudget(memory_budget=10)
+    budget.add("pinned", 20)
+    assert budget.add("big", 50, keep={"pinned"}) == []
+    assert "pinned" in budget and "big" in budget
+
+    unbounded = NamespaceBudget()
+    assert unbounded.add("a", 10**9) == []
+
+
+# pytest -vs tests/test_budget.py::test_reset_after_fork
+def test_reset_after_fork():
+    """Test the lock held by a thread of the parent is recreated after fork."""
+    budget = NamespaceBudget(memory_budget=100)
+    budget.add("a", 10)
+    budget._lock.acquire()
+    budget._reset_after_fork()
+    budget.touch("a")
+    assert budget.namespaces == ["a"]
@@ -0,0 +1,467 @@
+"""
+Test script for the sync apollo client against a local stand-in server.
+"""
+
+import os
+import time
+import signal
+import threading
+from urllib.parse import urlparse
+
+import pytest
+
+import pyapollo.client
+from pyapollo.client import ApolloClient
+from pyapollo.exceptions import ServerNotResponseException, StaleConfigException
+from pyapollo.snapshot import seal_snapshot
+from pyapollo.testing import FakeApolloServer
+from pyapollo.transport import Transport, get_transport
+
+
+class SwitchTransport(Transport):
+    """Transport failing every request while fail is set"""
+
+    name = "switch"
+
+    def __init__(self):
+        super().__init__()
+        self.fail = False
+        self.requests = []
+        self._transport = get_transport()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append((url, timeout))
+        if self.fail:
+            raise ServerNotResponseException(f"Request to {url} failed.")
+        return self._transport.get(url, params=params, headers=headers, timeout=timeout)
+
+    def close(self):
+        pass
+
+    def _reset_after_fork(self):
+        pass
+
+
+class ConfigOutageTransport(SwitchTransport):
+    """Transport failing every request but the meta server ones while fail is set"""
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if self.fail and "/services/config" in url:
+            self.requests.append((url, timeout))
+            return self._transport.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        return super().get(url, params=params, headers=headers, timeout=timeout)
+
+
+@pytest.fixture
+def server():
+    with FakeApolloServer(notification_hold=0.5) as server:
+        yield server
+
+
+def create_client(server, tmp_path, **kwargs):
+    return ApolloClient(
+        meta_server_address=server.url,
+        app_id="app",
+        cache_file_dir_path=str(tmp_path),
+        **kwargs,
+    )
+
+
+# pytest -vs tests/test_client.py::test_refresh_failure_keeps_memory
+def test_refresh_failure_keeps_memory(server, tmp_path, monkeypatch):
+    """A failed refresh keeps the in-memory snapshot and reports its age"""
+    server.publish("app", "application", {"a": "1"})
+    transport = SwitchTransport()
+    client = create_client(server, tmp_path, transport=transport)
+    try:
+        # An older release on disk must not replace the snapshot in memory
+        file_path = os.path.join(
+            client._cache_file_dir_path, client._get_cache_file_name("application")
+        )
+        with open(file_path, "wb") as f:
+            f.write(client._encode_cache_file({"a": "old"}))
+        disk_reads = []
+        read_cache_entry = client._read_cache_entry
+        monkeypatch.setattr(
+            client,
+            "_read_cache_entry",
+            lambda *args: disk_reads.append(args) or read_cache_entry(*args),
+        )
+
+        transport.fail = True
+        client.fetch_configuration()
+        client.fetch_configuration()
+        assert client.get_value("a") == "1"
+        assert disk_reads == []
+
+        time.sleep(0.1)
+        age = client.get_config_age("application")
+        assert age >= 0.1
+        assert list(client.get_stale_namespaces(0.05)) == ["application"]
+        with pytest.raises(StaleConfigException):
+            client.ensure_fresh(0.05)
+
+        transport.fail = False
+        client.fetch_configuration()
+        assert client.get_config_age("application") < age
+        assert client.get_stale_namespaces(10) == {}
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_notification_outlives_server_hold
+def test_notification_outlives_server_hold(tmp_path):
+    """A release during the server hold answers the held notification request"""
+    with FakeApolloServer(notification_hold=2) as server:
+        server.publish("app", "application", {"a": "1"})
+        transport = SwitchTransport()
+        client = create_client(
+            server,
+            tmp_path,
+            timeout=1,
+            fetch_strategy="configfiles",
+            transport=transport,
+        )
+        try:
+            polling_thread = client._polling_thread
+            client.stop_polling_thread()
+            polling_thread.join()
+
+            timer = threading.Timer(1.5, server.publish, ("app", "application", {}))
+            timer.start()
+            assert client._get_changed_namespaces() == ["application"]
+            timer.join()
+            timeouts = {
+                timeout
+                for url, timeout in transport.requests
+                if "/notifications/v2" in url
+            }
+            assert timeouts == {90}
+        finally:
+            client.close()
+
+
+# pytest -vs tests/test_client.py::test_corrupted_cache_file
+def test_corrupted_cache_file(server, tmp_path):
+    """A corrupted cache file only skips its namespace"""
+    server.publish("app", "application", {"a": "1"})
+    server.publish("app", "other", {"b": "2"})
+    client = create_client(server, tmp_path, namespaces=["application", "other"])
+    try:
+        client.stop_polling_thread()
+        file_path = os.path.join(
+            client._cache_file_dir_path, client._get_cache_file_name("other")
+        )
+        with open(file_path, "wb") as f:
+            f.write(b'{"b": "tru')
+        client._cache.clear()
+
+        assert client.load_local_cache_file()
+        assert client._cache["application"] == {"a": "1"}
+        assert "other" not in client._cache
+    finally:
+        client.close()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+# pytest -vs tests/test_client.py::test_configfiles_strategy
+def test_configfiles_strategy(server, tmp_path):
+    """Namespaces are read from /configfiles/json, and from /configs once a
+    notification says they changed"""
+    server.publish("app", "application", {"a": "1"})
+    server.publish("app", "other", {"b": "1"})
+    transport = SwitchTransport()
+    client = create_client(
+        server,
+        tmp_path,
+        namespaces=["application", "other"],
+        cycle_time=1,
+        fetch_strategy="configfiles",
+        transport=transport,
+    )
+    try:
+        assert client.get_value("a") == "1"
+        assert server.requests["configfiles"] == 2
+        assert server.requests["configs"] == 0
+
+        # The first notification only records the ids of the loaded releases
+        assert wait_until(lambda: -1 not in client._notification_map.values())
+        server.publish("app", "application", {"a": "2"})
+        assert wait_until(lambda: client.get_value("a") == "2")
+        configs_paths = [
+            urlparse(url).path for url, _ in transport.requests if "/configs/" in url
+        ]
+        assert configs_paths
+        assert set(configs_paths) == {"/configs/app/default/application"}
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_get_values_consistent
+def test_get_values_consistent(server, tmp_path):
+    """Bulk reads never mix two releases refreshed while they run"""
+    server.publish("app", "application", {"a": "0", "b": "0"})
+    client = create_client(server, tmp_path)
+    client.stop_polling_thread()
+    stop = threading.Event()
+
+    def refresh():
+        release = 0
+        while not stop.is_set():
+            release += 1
+            server.publish("app", "application", {"a": str(release), "b": str(release)})
+            client.fetch_configuration()
+
+    thread = threading.Thread(target=refresh)
+    thread.start()
+    try:
+        releases = set()
+        deadline = time.monotonic() + 5
+        while len(releases) < 5 and time.monotonic() < deadline:
+            values = client.get_values(["a", "b"])
+            assert values["a"] == values["b"]
+            values = client.get_values_by_namespace({"application": ["a", "b"]})
+            assert values["application"]["a"] == values["application"]["b"]
+            releases.add(values["application"]["a"])
+        assert len(releases) == 5
+    finally:
+        stop.set()
+        thread.join()
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_fork_restarts_polling
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_restarts_polling(server, tmp_path):
+    """A forked child keeps the inherited snapshot and refreshes it"""
+    server.publish("app", "application", {"a": "1"})
+    client = create_client(
+        server,
+        tmp_path,
+        cycle_time=1,
+        lazy_namespaces=True,
+        access_stats_sample_rate=1.0,
+    )
+    try:
+        assert client.get_value("a") == "1"
+
+        # Fork while another thread holds the locks taken on every read
+        locked = threading.Event()
+        release_locks = threading.Event()
+
+        def hold_locks():
+            with client._namespace_budget._lock, client._access_stats._lock:
+                locked.set()
+                release_locks.wait()
+
+        thread = threading.Thread(target=hold_locks)
+        thread.start()
+        locked.wait()
+        pid = os.fork()
+        if pid == 0:
+            # A deadlocked child is killed instead of hanging the test
+            signal.alarm(10)
+            exit_code = 1
+            try:
+                alive = client._polling_thread is not None
+                alive = alive and client._polling_thread.is_alive()
+                warm = client.get_value("a") == "1"
+                refreshed = wait_until(lambda: client.get_value("a") == "2")
+                exit_code = 0 if alive and warm and refreshed else 2
+            finally:
+                os._exit(exit_code)
+        release_locks.set()
+        thread.join()
+        server.publish("app", "application", {"a": "2"})
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_load_custom_namespace_from_manifest
+def test_load_custom_namespace_from_manifest(server, tmp_path):
+    """Only the configured namespaces are loaded, by their full name"""
+    release_key = server.publish("app", "my_ns", {"a": "1"})
+    client = create_client(server, tmp_path, namespaces=["my_ns"])
+    try:
+        client.stop_polling_thread()
+        for file_name in ("app_configuration_stray.txt", "other_configuration_ns.txt"):
+            with open(os.path.join(client._cache_file_dir_path, file_name), "wb") as f:
+                f.write(client._encode_cache_file({"a": "stray"}))
+        client._cache.clear()
+        client._hash.clear()
+
+        assert client.load_local_cache_file()
+        assert client._cache == {"my_ns": {"a": "1"}}
+        assert client._hash == {"my_ns": release_key}
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_polling_survives_meta_server_outage
+def test_polling_survives_meta_server_outage(server, tmp_path):
+    """A meta server answering 503 during an outage does not stop the polling"""
+    server.publish("app", "application", {"a": "1"})
+    transport = ConfigOutageTransport()
+    client = create_client(server, tmp_path, cycle_time=1, transport=transport)
+    try:
+        assert client.get_value("a") == "1"
+
+        transport.fail = True
+        server.outage_status = 503
+        assert wait_until(lambda: server.requests["outage"] >= 2)
+        assert client._polling_thread.is_alive()
+        assert client.get_value("a") == "1"
+
+        server.outage_status = None
+        transport.fail = False
+        server.publish("app", "application", {"a": "2"})
+        assert wait_until(lambda: client.get_value("a") == "2")
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_incremental_sync
+def test_incremental_sync(tmp_path):
+    """The changes of an incremental sync are applied without a full refetch"""
+    with FakeApolloServer(incremental_sync=True) as server:
+        server.publish("app", "application", {"a": "1", "b": "2"})
+        transport = SwitchTransport()
+        client = create_client(server, tmp_path, transport=transport)
+        try:
+            client.stop_polling_thread()
+            transport.requests.clear()
+
+            server.publish("app", "application", {"a": "10", "c": "3"})
+            client.fetch_configuration()
+            assert client.get_values(["a", "b", "c"]) == {
+                "a": "10",
+                "b": None,
+                "c": "3",
+            }
+            assert server.requests["incremental"] == 1
+            # The only /configs request carried the release key of the snapshot
+            urls = [url for url, _ in transport.requests if "/configs/" in url]
+            assert len(urls) == 1 and "releaseKey=" in urls[0]
+        finally:
+            client.close()
+
+
+# pytest -vs tests/test_client.py::test_concurrent_construction
+def test_concurrent_construction(server, tmp_path, monkeypatch):
+    """Concurrent constructions of the same app share one client and thread"""
+    server.publish("app", "application", {"a": "1"})
+    monkeypatch.setenv("APOLLO_META_SERVER_ADDRESS", server.url)
+    monkeypatch.setenv("APOLLO_APP_ID", "app")
+    monkeypatch.setenv("APOLLO_CACHE_FILE_DIR_PATH", str(tmp_path))
+    loaded = []
+    settings_class = pyapollo.client.ApolloSettingsConfig
+    monkeypatch.setattr(
+        pyapollo.client,
+        "ApolloSettingsConfig",
+        lambda *args, **kwargs: loaded.append(1) or settings_class(*args, **kwargs),
+    )
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def construct():
+        barrier.wait()
+        clients.append(ApolloClient())
+
+    threads = [threading.Thread(target=construct) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client = clients[0]
+    try:
+        assert len(clients) == 8 and all(other is client for other in clients)
+        assert client._users == 8
+        assert server.requests["configs"] == 1
+        # The settings are loaded from the environment once per construction
+        assert len(loaded) == 8
+        assert client.get_value("a") == "1"
+    finally:
+        for other in clients:
+            other.close()
+    assert client._polling_thread is None
+    assert client._instance_key not in ApolloClient._instances
+
+
+# pytest -vs tests/test_client.py::test_failed_construction_releases_key
+def test_failed_construction_releases_key(server, tmp_path):
+    """A failed construction frees the registry key for the next one"""
+    server.publish("app", "application", {"a": "1"})
+    transport = SwitchTransport()
+    transport.fail = True
+    with pytest.raises((Exception, ServerNotResponseException)):
+        create_client(server, tmp_path, transport=transport)
+    key, _ = ApolloClient._resolve_instance_key(
+        meta_server_address=server.url, app_id="app"
+    )
+    assert key not in ApolloClient._instances
+
+    transport.fail = False
+    with create_client(server, tmp_path, transport=transport) as client:
+        assert client.get_value("a") == "1"
+
+
+# pytest -vs tests/test_client.py::test_read_after_concurrent_eviction
+def test_read_after_concurrent_eviction(server, tmp_path, monkeypatch):
+    """A namespace evicted right after its lazy load is loaded again for the read"""
+    server.publish("app", "application", {"a": "1"})
+    client = create_client(server, tmp_path, lazy_namespaces=True)
+    try:
+        load_namespace = client.load_namespace
+        evict = [True]
+
+        def load_and_evict(namespace="application"):
+            load_namespace(namespace)
+            if evict[0]:
+                # Evicted by the load of another thread before the read
+                client._cache.pop(namespace, None)
+                evict[0] = False
+
+        monkeypatch.setattr(client, "load_namespace", load_and_evict)
+        assert client.get_value("a") == "1"
+        evict[0] = True
+        assert client.get_values(["a"]) == {"a": "1"}
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_client.py::test_snapshot_boot_writes_cache
+def test_snapshot_boot_writes_cache(server, tmp_path):
+    """A client booted from a snapshot writes its cache files and manifest"""
+    release_key = server.publish("app", "application", {"a": "1"})
+    snapshot_dir = tmp_path / "snapshot"
+    cache_dir = tmp_path / "cache"
+    baker = create_client(server, snapshot_dir)
+    baker.close()
+    seal_snapshot(str(snapshot_dir), "app", "default", "DEV", baker._codec)
+
+    transport = SwitchTransport()
+    transport.fail = True
+    client = create_client(
+        server, cache_dir, snapshot_dir_path=str(snapshot_dir), transport=transport
+    )
+    try:
+        assert client.get_value("a") == "1"
+        assert client._read_manifest()["application"]["release_key"] == release_key
+        data, _ = client._read_cache_entry(
+            "application", client._read_manifest()["application"]
+        )
+        assert data == {"a": "1"}
+    finally:
+        client.close()
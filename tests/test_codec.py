@@ -0,0 +1,30 @@
+"""
+Test script for the JSON codecs.
+"""
+
+import pytest
+
+from pyapollo.codec import JSONCodec, get_codec
+
+
+# pytest -vs tests/test_codec.py::test_round_trip
+def test_round_trip():
+    """Test every installed codec encodes and decodes the same documents."""
+    data = {"key": "value", "中文": "值", "nested": '{"a": [1, 2]}'}
+    for name in ("auto", "orjson", "msgspec", "json"):
+        try:
+            codec = get_codec(name)
+        except ValueError:
+            continue
+        assert codec.loads(codec.dumps(data)) == data
+        assert codec.loads(JSONCodec().dumps(data)) == data
+        assert codec.loads('{"a": "1"}') == {"a": "1"}
+        with pytest.raises(ValueError):
+            codec.loads(b"{not json")
+
+
+# pytest -vs tests/test_codec.py::test_unknown_codec
+def test_unknown_codec():
+    """Test an unknown codec name raises ValueError."""
+    with pytest.raises(ValueError):
+        get_codec("yaml")
@@ -0,0 +1,35 @@
+"""
+Test script for the compact in-memory namespace storage.
+"""
+
+from pyapollo.compact import CompactNamespace
+from pyapollo.key_index import KeyIndex
+
+
+# pytest -vs tests/test_compact.py::test_mapping_interface
+def test_mapping_interface():
+    """Test the compact namespace reads like the dict it was built from."""
+    data = {"b": "2", "a": "1", "c": '{"x": 1}'}
+    compact = CompactNamespace.build(data)
+
+    assert compact == data
+    assert data == compact
+    assert list(compact) == ["a", "b", "c"]
+    assert compact["b"] == "2"
+    assert compact.get("missing", "default") == "default"
+    assert "a" in compact and "missing" not in compact
+    assert len(compact) == 3
+    assert list(KeyIndex(compact).prefix("b")) == ["b"]
+
+
+# pytest -vs tests/test_compact.py::test_shares_unchanged_entries
+def test_shares_unchanged_entries():
+    """Test a new release shares unchanged values with the previous one."""
+    previous = CompactNamespace.build({"a": "x" * 100, "b": "old"})
+    data = {"a": "".join(["x"] * 100), "b": "new", "c": "added"}
+    current = CompactNamespace.build(data, previous)
+
+    assert current == data
+    assert current["a"] is previous["a"]
+    assert current["b"] == "new"
+    assert CompactNamespace.build(dict(current), current) is current
@@ -0,0 +1,26 @@
+"""
+Test script for the compression of the local cache files.
+"""
+
+import json
+
+import pytest
+
+from pyapollo.compression import DecompressionError, compress, decompress
+
+DATA = json.dumps({"key": "value" * 100}).encode("utf-8")
+
+
+# pytest -vs tests/test_compression.py::test_round_trip
+def test_round_trip():
+    """Test compressed and plain data are read back unchanged."""
+    assert decompress(compress(DATA, None)) == DATA
+    assert len(compress(DATA, "zlib")) < len(DATA)
+    assert decompress(compress(DATA, "zlib")) == DATA
+
+
+# pytest -vs tests/test_compression.py::test_corrupted
+def test_corrupted():
+    """Test corrupted compressed data raises DecompressionError."""
+    with pytest.raises(DecompressionError):
+        decompress(compress(DATA, "zlib")[:-8])
@@ -0,0 +1,38 @@
+"""
+Test script for the in-memory release history.
+"""
+
+from pyapollo.history import ReleaseHistory
+
+
+# pytest -vs tests/test_history.py::test_bounded_history
+def test_bounded_history():
+    """Test the history keeps the latest releases, newest first."""
+    history = ReleaseHistory(size=2)
+    for release in ("r1", "r2", "r2", "r3"):
+        history.record("application", release, {"key": release})
+
+    assert [r.release_key for r in history.get("application")] == ["r3", "r2"]
+    assert history.get("other") == []
+
+
+# pytest -vs tests/test_history.py::test_find_release
+def test_find_release():
+    """Test a release is found by key, and the previous one by default."""
+    history = ReleaseHistory()
+    history.record("application", "r1", {"key": "1"})
+    assert history.find("application") is None
+
+    history.record("application", "r2", {"key": "2"})
+    assert history.find("application").configurations == {"key": "1"}
+    assert history.find("application", "r2").configurations == {"key": "2"}
+    assert history.find("application", "missing") is None
+
+
+# pytest -vs tests/test_history.py::test_disabled_history
+def test_disabled_history():
+    """Test a zero size disables the history."""
+    history = ReleaseHistory(size=0)
+    history.record("application", "r1", {"key": "1"})
+
+    assert history.get("application") == []
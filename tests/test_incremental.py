@@ -0,0 +1,37 @@
+"""
+Test script for the incremental configuration sync.
+"""
+
+import pytest
+
+from pyapollo.incremental import apply_changes, is_incremental
+
+
+# pytest -vs tests/test_incremental.py::test_apply_changes
+def test_apply_changes():
+    """Test the changes are applied to a copy of the configurations."""
+    configurations = {"a": "1", "b": "2", "c": "3"}
+    result = apply_changes(
+        configurations,
+        [
+            {"key": "a", "newValue": "10", "configurationChangeType": "MODIFIED"},
+            {"key": "b", "configurationChangeType": "DELETED"},
+            {"key": "d", "newValue": "4", "configurationChangeType": "ADDED"},
+        ],
+    )
+
+    assert result == {"a": "10", "c": "3", "d": "4"}
+    assert configurations == {"a": "1", "b": "2", "c": "3"}
+
+
+# pytest -vs tests/test_incremental.py::test_invalid_changes
+def test_invalid_changes():
+    """Test unknown sync types are full syncs and unknown changes are rejected."""
+    assert not is_incremental({"configurations": {}})
+    assert not is_incremental({"configSyncType": "FullSync"})
+    assert not is_incremental({"configSyncType": "PARTIAL"})
+    assert is_incremental({"configSyncType": "IncrementalSync"})
+    with pytest.raises(ValueError):
+        apply_changes({}, [{"key": "a", "configurationChangeType": "RENAMED"}])
+    with pytest.raises(ValueError):
+        apply_changes({}, [{"newValue": "1", "configurationChangeType": "ADDED"}])
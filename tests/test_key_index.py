@@ -0,0 +1,52 @@
+"""
+Test script for the sorted key index of namespace snapshots.
+"""
+
+from pyapollo.key_index import KeyIndex
+
+SNAPSHOT = {
+    "db.primary.host": "10.0.0.1",
+    "db.primary.port": "5432",
+    "db.replica.host": "10.0.0.2",
+    "feature.a": "on",
+    "feature.b": "off",
+    "timeout": "10",
+}
+
+
+# pytest -vs tests/test_key_index.py::test_prefix
+def test_prefix():
+    """Test prefix lookups return only the matching keys in order."""
+    index = KeyIndex(SNAPSHOT)
+
+    view = index.prefix("db.primary.")
+    assert list(view) == ["db.primary.host", "db.primary.port"]
+    assert view["db.primary.port"] == "5432"
+    assert "db.replica.host" not in view
+    assert dict(index.prefix("feature.")) == {"feature.a": "on", "feature.b": "off"}
+    assert len(index.prefix("missing.")) == 0
+    assert len(index.prefix("")) == len(SNAPSHOT)
+
+
+# pytest -vs tests/test_key_index.py::test_range
+def test_range():
+    """Test range lookups with open and closed bounds."""
+    index = KeyIndex(SNAPSHOT)
+
+    assert list(index.range("db.replica", "feature.b")) == [
+        "db.replica.host",
+        "feature.a",
+    ]
+    assert list(index.range(end="db.primary.port")) == ["db.primary.host"]
+    assert list(index.range(start="timeout")) == ["timeout"]
+    assert list(index.range("z", "a")) == []
+
+
+# pytest -vs tests/test_key_index.py::test_view_reads_through
+def test_view_reads_through():
+    """Test views read values from the snapshot without copying it."""
+    snapshot = dict(SNAPSHOT)
+    view = KeyIndex(snapshot).prefix("feature.")
+    snapshot["feature.a"] = "off"
+
+    assert view["feature.a"] == "off"
@@ -0,0 +1,63 @@
+"""
+Test script for the discovery over several meta server addresses.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from pyapollo.meta import MetaServers, split_meta_server_addresses
+
+
+# pytest -vs tests/test_meta.py::test_split_addresses
+def test_split_addresses():
+    """Test the addresses are split on commas without trailing slashes."""
+    assert split_meta_server_addresses(" http://a:8080/, ,http://b ") == [
+        "http://a:8080",
+        "http://b",
+    ]
+    assert split_meta_server_addresses(None) == []
+
+
+# pytest -vs tests/test_meta.py::test_race_remembers_fastest
+def test_race_remembers_fastest():
+    """Test the first valid answer wins and its address is queried next."""
+    calls = []
+
+    def get(address):
+        calls.append(address)
+        if address == "http://down":
+            raise ValueError("down")
+        if address == "http://slow":
+            time.sleep(0.2)
+        return address
+
+    meta_servers = MetaServers("http://slow,http://down,http://fast")
+    assert meta_servers.query(get) == "http://fast"
+    assert meta_servers.fastest == "http://fast"
+
+    calls.clear()
+    assert meta_servers.query(get) == "http://fast"
+    assert calls == ["http://fast"]
+
+    meta_servers.fastest = "http://down"
+    assert meta_servers.query(get) == "http://fast"
+
+
+# pytest -vs tests/test_meta.py::test_race_async
+def test_race_async():
+    """Test the async race and the error when every address fails."""
+
+    async def get(address):
+        if address == "http://slow":
+            await asyncio.sleep(1)
+        return address
+
+    async def fail(address):
+        raise ValueError(address)
+
+    meta_servers = MetaServers("http://slow,http://fast")
+    assert asyncio.run(meta_servers.query_async(get)) == "http://fast"
+    with pytest.raises(ValueError):
+        asyncio.run(MetaServers("http://a,http://b").query_async(fail))
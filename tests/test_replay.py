@@ -0,0 +1,65 @@
+"""
+Test script for the recording and replay transports.
+"""
+
+import pytest
+
+from pyapollo.exceptions import ServerNotResponseException
+from pyapollo.replay import RecordingTransport, ReplayTransport
+from pyapollo.transport import Transport, TransportResponse
+
+
+class ScriptedTransport(Transport):
+    """Transport answering the requests with scripted responses"""
+
+    name = "scripted"
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = self.responses.pop(0)
+        if response is None:
+            raise ServerNotResponseException(f"Request to {url} timed out.")
+        return response
+
+    def close(self):
+        pass
+
+    def _reset_after_fork(self):
+        pass
+
+
+# pytest -vs tests/test_replay.py::test_record_and_replay
+def test_record_and_replay(tmp_path):
+    """Test the recorded responses are replayed in order by url path."""
+    path = str(tmp_path / "traffic.jsonl")
+    recorder = RecordingTransport(
+        ScriptedTransport(
+            [
+                TransportResponse(200, b'{"a": "1"}'),
+                None,
+                TransportResponse(200, b'{"a": "2"}'),
+            ]
+        ),
+        path,
+    )
+    url = "http://config:8080/configfiles/json/app/default/application"
+    assert recorder.get(url, headers={"Authorization": "secret"}).status_code == 200
+    with pytest.raises(ServerNotResponseException):
+        recorder.get(url)
+    recorder.get(url)
+    recorder.close()
+    with open(path) as f:
+        assert "secret" not in f.read()
+
+    replay = ReplayTransport(path, speed=None)
+    other_host = "http://replay/configfiles/json/app/default/application"
+    assert replay.get(other_host).content == b'{"a": "1"}'
+    with pytest.raises(ServerNotResponseException):
+        replay.get(other_host)
+    assert replay.get(other_host).content == b'{"a": "2"}'
+    assert replay.get(other_host).content == b'{"a": "2"}'
+    with pytest.raises(ServerNotResponseException):
+        replay.get("http://replay/services/config")
@@ -0,0 +1,47 @@
+"""
+Test script for the DNS cache shared by the clients.
+"""
+
+import socket
+
+import pytest
+
+from pyapollo.resolver import DNSCache
+
+ADDRESSES = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 8080))]
+
+
+# pytest -vs tests/test_resolver.py::test_cached_until_ttl
+def test_cached_until_ttl(monkeypatch):
+    """Test a host is resolved again only after the TTL."""
+    lookups = []
+
+    def getaddrinfo(host, *args):
+        lookups.append(host)
+        return ADDRESSES
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    cache = DNSCache(ttl=60)
+    assert cache.getaddrinfo("apollo", 8080) == ADDRESSES
+    assert cache.getaddrinfo("apollo", 8080) == ADDRESSES
+    assert lookups == ["apollo"]
+
+    cache.ttl = 0
+    cache.getaddrinfo("apollo", 8080)
+    assert lookups == ["apollo", "apollo"]
+
+
+# pytest -vs tests/test_resolver.py::test_stale_on_error
+def test_stale_on_error(monkeypatch):
+    """Test the last addresses are used when the lookup fails."""
+    cache = DNSCache(ttl=0)
+    monkeypatch.setattr(socket, "getaddrinfo", lambda *args: ADDRESSES)
+    cache.getaddrinfo("apollo", 8080)
+
+    def getaddrinfo(*args):
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    assert cache.getaddrinfo("apollo", 8080) == ADDRESSES
+    with pytest.raises(socket.gaierror):
+        cache.getaddrinfo("other", 8080)
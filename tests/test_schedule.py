@@ -0,0 +1,53 @@
+"""
+Test script for the polling schedule of the namespaces.
+"""
+
+import pytest
+
+from pyapollo.schedule import PollSchedule
+
+
+# pytest -vs tests/test_schedule.py::test_adaptive_interval
+def test_adaptive_interval():
+    """Test the interval backs off while unchanged and resets on a change."""
+    schedule = PollSchedule(10, min_cycle_time=5, max_cycle_time=40)
+    schedule.start(["application"], now=0)
+    assert schedule.due(["application", "common"], now=9) == ["common"]
+    assert schedule.next_wait(["application"], now=4) == 6
+
+    for expected in (20, 40, 40):
+        schedule.record("application", changed=False, now=0)
+        assert schedule.get_interval("application") == expected
+    schedule.record("application", changed=True, now=0)
+    assert schedule.get_interval("application") == 5
+    assert schedule.due(["application"], now=5) == ["application"]
+
+
+# pytest -vs tests/test_schedule.py::test_jitter_and_startup_spread
+def test_jitter_and_startup_spread():
+    """Test the jitter and the startup spread stay within their bounds."""
+    schedule = PollSchedule(10, jitter=0.2, startup_spread=30)
+    for _ in range(100):
+        schedule.start(["application"], now=0)
+        assert 8 <= schedule.next_wait(["application"], now=0) <= 42
+        schedule.record("application", changed=False, now=0)
+        assert 8 <= schedule.next_wait(["application"], now=0) <= 12
+
+
+# pytest -vs tests/test_schedule.py::test_invalid_bounds
+def test_invalid_bounds():
+    """Test a minimum cycle time above the maximum one is rejected."""
+    with pytest.raises(ValueError):
+        PollSchedule(10, min_cycle_time=20, max_cycle_time=15)
+
+
+# pytest -vs tests/test_schedule.py::test_add_and_remove
+def test_add_and_remove():
+    """Test a loaded namespace is scheduled and a removed one is due at once."""
+    schedule = PollSchedule(30)
+    schedule.add("lazy", now=0)
+    assert schedule.due(["lazy"], now=10) == []
+    assert schedule.due(["lazy"], now=30) == ["lazy"]
+
+    schedule.remove("lazy")
+    assert schedule.due(["lazy"], now=1) == ["lazy"]
@@ -0,0 +1,74 @@
+"""
+Test script for the single-flight of concurrent calls.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pyapollo.singleflight import AsyncSingleFlight, SingleFlight
+
+
+# pytest -vs tests/test_singleflight.py::test_threads_share_one_call
+def test_threads_share_one_call():
+    """Test concurrent threads share the call in flight and its result."""
+    single_flight = SingleFlight()
+    calls = []
+
+    def fetch(namespace):
+        calls.append(namespace)
+        time.sleep(0.1)
+        return namespace.upper()
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                single_flight.do("application", fetch, "application")
+            )
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["application"]
+    assert results == ["APPLICATION"] * 5
+    assert single_flight.do("application", fetch, "application") == "APPLICATION"
+    assert len(calls) == 2
+
+
+# pytest -vs tests/test_singleflight.py::test_exception_is_shared
+def test_exception_is_shared():
+    """Test the exception of the call is raised to its caller."""
+    single_flight = SingleFlight()
+
+    def fetch():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        single_flight.do("application", fetch)
+
+
+# pytest -vs tests/test_singleflight.py::test_coroutines_share_one_call
+def test_coroutines_share_one_call():
+    """Test concurrent coroutines share the call in flight by key."""
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch(namespace):
+        calls.append(namespace)
+        await asyncio.sleep(0.01)
+        return namespace
+
+    async def main():
+        return await asyncio.gather(
+            *(single_flight.do(ns, fetch, ns) for ns in ["a", "a", "b", "a"])
+        )
+
+    assert asyncio.run(main()) == ["a", "a", "b", "a"]
+    assert sorted(calls) == ["a", "b"]
@@ -0,0 +1,84 @@
+"""
+Test script for the offline snapshots baked with pyapollo bake.
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from pyapollo.codec import JSONCodec
+from pyapollo.snapshot import (
+    get_manifest_file_name,
+    get_snapshot_entries,
+    read_manifest_entries,
+    seal_snapshot,
+    verify_snapshot_file,
+    write_manifest_entry,
+)
+
+
+def write_cache(tmp_path):
+    (tmp_path / "app_configuration_application.txt").write_bytes(b'{"a": "1"}')
+    manifest = {
+        "app_id": "app",
+        "namespaces": {
+            "application": {
+                "file": "app_configuration_application.txt",
+                "release_key": "r1",
+            }
+        },
+    }
+    (tmp_path / get_manifest_file_name("app")).write_text(json.dumps(manifest))
+
+
+# pytest -vs tests/test_snapshot.py::test_seal_and_verify
+def test_seal_and_verify(tmp_path):
+    """Test a sealed snapshot verifies its files and rejects tampered ones."""
+    write_cache(tmp_path)
+    seal_snapshot(str(tmp_path), "app", "default", "DEV", JSONCodec())
+
+    with open(os.path.join(tmp_path, get_manifest_file_name("app"))) as f:
+        manifest = json.load(f)
+    entries = get_snapshot_entries(manifest, "app", "default", "DEV")
+    entry = entries["application"]
+    verify_snapshot_file(entry, b'{"a": "1"}')
+    with pytest.raises(ValueError):
+        verify_snapshot_file(entry, b'{"a": "2"}')
+
+
+# pytest -vs tests/test_snapshot.py::test_rejected_manifest
+def test_rejected_manifest(tmp_path):
+    """Test unsealed manifests and snapshots of another env are rejected."""
+    write_cache(tmp_path)
+    with open(os.path.join(tmp_path, get_manifest_file_name("app"))) as f:
+        unsealed = json.load(f)
+    with pytest.raises(ValueError):
+        get_snapshot_entries(unsealed, "app", "default", "DEV")
+
+    manifest = seal_snapshot(str(tmp_path), "app", "default", "DEV", JSONCodec())
+    with pytest.raises(ValueError):
+        get_snapshot_entries(manifest, "app", "default", "PRO")
+
+
+# pytest -vs tests/test_snapshot.py::test_concurrent_manifest_entries
+def test_concurrent_manifest_entries(tmp_path):
+    """Test concurrent writers of a manifest keep every entry."""
+    manifest_path = os.path.join(tmp_path, get_manifest_file_name("app"))
+    namespaces = [f"namespace{i}" for i in range(16)]
+
+    def write(namespace):
+        for _ in range(20):
+            entry = {"file": f"app_configuration_{namespace}.txt", "release_key": "r"}
+            write_manifest_entry(manifest_path, "app", namespace, entry, JSONCodec())
+
+    threads = [threading.Thread(target=write, args=(ns,)) for ns in namespaces]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(read_manifest_entries(manifest_path, JSONCodec())) == sorted(
+        namespaces
+    )
+    assert os.listdir(tmp_path) == [get_manifest_file_name("app")]
@@ -0,0 +1,89 @@
+"""
+Test script for the sampled statistics of the configuration reads.
+"""
+
+import sys
+from unittest.mock import patch
+
+from pyapollo.compact import CompactNamespace
+from pyapollo.stats import AccessStats, NamespaceAccounting, get_deep_size
+
+
+# pytest -vs tests/test_stats.py::test_report
+def test_report():
+    """Test the report lists hot keys, unread keys and namespace read rates."""
+    stats = AccessStats(sample_rate=1.0)
+    for _ in range(3):
+        stats.record("application", "hot")
+    stats.record_many("application", ["warm"])
+    report = stats.report(
+        {"application": {"hot": "1", "warm": "2", "cold": "3"}, "common": None},
+        top=1,
+    )
+
+    assert report.top_keys == [("application", "hot", 3.0)]
+    assert report.unread_keys == {"application": ["cold"], "common": []}
+    assert report.namespace_read_rates["application"] > 0
+    assert report.namespace_read_rates["common"] == 0
+
+
+# pytest -vs tests/test_stats.py::test_disabled_and_reset
+def test_disabled_and_reset():
+    """Test nothing is counted at sample rate 0 and reset forgets the reads."""
+    stats = AccessStats()
+    with patch("random.random", side_effect=AssertionError("sampled")):
+        stats.record("application", "key")
+    assert stats.report({"application": {"key": "1"}}).top_keys == []
+
+    stats.sample_rate = 1.0
+    stats.record("application", "key")
+    stats.reset()
+    assert stats.report({"application": {"key": "1"}}).unread_keys == {
+        "application": ["key"]
+    }
+
+
+# pytest -vs tests/test_stats.py::test_reset_after_fork
+def test_reset_after_fork():
+    """Test the lock held by a thread of the parent is recreated after fork."""
+    stats = AccessStats(sample_rate=1.0)
+    stats._lock.acquire()
+    stats._reset_after_fork()
+    stats.record("application", "key")
+    assert stats.report({"application": {"key": "1"}}).top_keys == [
+        ("application", "key", 1.0)
+    ]
+
+
+# pytest -vs tests/test_stats.py::test_deep_size
+def test_deep_size():
+    """Test the deep size counts the keys and values, shared objects once."""
+    value = "v" * 1000
+    snapshot = {"a": value, "b": value}
+    assert get_deep_size(snapshot) == (
+        sys.getsizeof(snapshot)
+        + sys.getsizeof("a")
+        + sys.getsizeof("b")
+        + sys.getsizeof(value)
+    )
+    assert get_deep_size(CompactNamespace.build(snapshot)) > sys.getsizeof(value)
+
+
+# pytest -vs tests/test_stats.py::test_namespace_accounting
+def test_namespace_accounting():
+    """Test the namespace stats and the memory size cached per snapshot."""
+    accounting = NamespaceAccounting()
+    assert accounting.get_stats("application", None, None).payload_size is None
+
+    snapshot = {"key": "value"}
+    accounting.record_payload("application", 100, 0.5)
+    stats = accounting.get_stats("application", snapshot, "r1")
+    assert (stats.key_count, stats.payload_size, stats.decode_time) == (1, 100, 0.5)
+    assert stats.release_key == "r1"
+
+    snapshot["other"] = "x" * 1000  # Snapshots are never mutated by the clients
+    cached = accounting.get_stats("application", snapshot, "r1")
+    assert cached.memory_size == stats.memory_size
+    assert accounting.get_stats("application", dict(snapshot), "r2").memory_size > (
+        stats.memory_size
+    )
@@ -0,0 +1,134 @@
+"""
+Test script for the local stand-in apollo server and the soak harness.
+"""
+
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import pytest
+
+from pyapollo.client import ApolloClient
+from pyapollo.soak import run_soak
+from pyapollo.testing import FakeApolloServer
+
+
+def get_json(url):
+    try:
+        with urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except HTTPError as e:
+        if e.code != 304:
+            raise
+        return 304, None
+
+
+@pytest.fixture
+def server():
+    with FakeApolloServer(notification_hold=0.5) as server:
+        yield server
+
+
+# pytest -vs tests/test_testing.py::test_configs_release_key
+def test_configs_release_key(server):
+    """An unchanged release key is answered with 304"""
+    release_key = server.publish("app", "application", {"key": "value"})
+    status, data = get_json(f"{server.url}/configs/app/default/application")
+    assert status == 200
+    assert data["configurations"] == {"key": "value"}
+    assert data["releaseKey"] == release_key
+    status, data = get_json(
+        f"{server.url}/configs/app/default/application?releaseKey={release_key}"
+    )
+    assert (status, data) == (304, None)
+    with pytest.raises(HTTPError):
+        get_json(f"{server.url}/configs/app/default/unknown")
+    assert server.requests["configs"] == 3
+
+
+# pytest -vs tests/test_testing.py::test_notifications
+def test_notifications(server):
+    """A held notification request returns as soon as a release is published"""
+    server.publish("app", "application", {"key": "value"})
+    notifications = quote(
+        json.dumps([{"namespaceName": "application", "notificationId": 1}])
+    )
+    url = f"{server.url}/notifications/v2?appId=app&cluster=default"
+    url += f"&notifications={notifications}"
+    assert get_json(url) == (304, None)
+
+    timer = threading.Timer(0.1, server.publish, ("app", "application", {}))
+    timer.start()
+    status, data = get_json(url)
+    timer.join()
+    assert status == 200
+    assert data == [{"namespaceName": "application", "notificationId": 2}]
+
+
+# pytest -vs tests/test_testing.py::test_client
+def test_client(server, tmp_path):
+    """A client reads the published namespaces from the server"""
+    server.publish("app", "application", {"key": "value"})
+    client = ApolloClient(
+        meta_server_address=server.url,
+        app_id="app",
+        cache_file_dir_path=str(tmp_path),
+    )
+    try:
+        assert client.get_value("key") == "value"
+    finally:
+        client.close()
+
+
+# pytest -vs tests/test_testing.py::test_client_registry
+def test_client_registry(server, tmp_path):
+    """The same app is one client until its last user closes it"""
+    server.publish("app", "application", {"key": "value"})
+    server.publish("app", "other", {"key": "other"})
+    client = ApolloClient(
+        server.url,
+        "app",
+        namespaces=["application", "other"],
+        cache_file_dir_path=str(tmp_path),
+    )
+    same = ApolloClient(
+        meta_server_address=f"{server.url}/",
+        app_id="app",
+        namespaces=["other", "application"],
+        cache_file_dir_path=str(tmp_path),
+    )
+    assert same is client
+    client.close()
+    assert client._polling_thread is not None
+    same.close()
+    assert client._polling_thread is None
+    with ApolloClient(
+        server.url,
+        "app",
+        namespaces=["application", "other"],
+        cache_file_dir_path=str(tmp_path),
+    ) as other:
+        assert other is not client
+        assert other.get_value("key") == "value"
+    assert other._instance_key not in ApolloClient._instances
+
+
+# pytest -vs tests/test_testing.py::test_run_soak
+def test_run_soak():
+    """Every sample of a soak run counts the clients and the served requests"""
+    samples = run_soak(
+        sync_clients=2,
+        async_clients=2,
+        namespaces=2,
+        duration=2.5,
+        sample_interval=1.0,
+        publish_interval=0.2,
+        cycle_time=1,
+    )
+    assert len(samples) == 2
+    for sample in samples:
+        assert sample.clients == 4
+        assert sample.request_rate > 0
+        assert sample.refresh_latency is not None
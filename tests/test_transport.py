@@ -0,0 +1,37 @@
+"""
+Test script for the HTTP transports of the clients.
+"""
+
+import pytest
+
+from pyapollo.transport import (
+    AiohttpTransport,
+    RequestsTransport,
+    create_async_transport,
+    get_transport,
+)
+
+
+# pytest -vs tests/test_transport.py::test_shared_sync_transport
+def test_shared_sync_transport():
+    """Test the sync clients of the process share the default transport."""
+    transport = get_transport()
+
+    assert isinstance(transport, RequestsTransport)
+    assert get_transport("default") is transport
+
+
+# pytest -vs tests/test_transport.py::test_async_transport
+def test_async_transport():
+    """Test every async client gets its own default transport."""
+    transport = create_async_transport()
+
+    assert isinstance(transport, AiohttpTransport)
+    assert create_async_transport() is not transport
+
+
+# pytest -vs tests/test_transport.py::test_unknown_transport
+def test_unknown_transport():
+    """Test an unknown transport is rejected."""
+    with pytest.raises(ValueError):
+        get_transport("curl")